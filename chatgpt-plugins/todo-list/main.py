@@ -1,53 +1,158 @@
+import asyncio
 import json
+import os
 
 import quart
 import quart_cors
 from quart import request
 
+from static_assets import StaticAsset, watch_assets
+from todo_store import TodoStore
+
 app = quart_cors.cors(quart.Quart(__name__), allow_origin="https://chat.openai.com")
 
-# Keep track of todo's. Does not persist if Python session is restarted.
-_TODOS = {}
+# Keep track of todo's in SQLite so they survive restarts.
+_STORE = TodoStore("todos.db")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BATCH_SIZE = 100
+
+# Serve the manifest, OpenAPI spec and logo from memory, with the origin rendered for the requesting Host.
+PLUGIN_ORIGIN = "http://localhost:5003"
+_MANIFEST = StaticAsset("./.well-known/ai-plugin.json", "text/json", origin=PLUGIN_ORIGIN)
+_OPENAPI_SPEC = StaticAsset("openapi.yaml", "text/yaml", origin=PLUGIN_ORIGIN)
+_LOGO = StaticAsset("logo.png", "image/png", max_age=86400)
+# Set WATCH_PLUGIN_FILES=1 to reload those files when they change on disk.
+WATCH_PLUGIN_FILES = os.getenv("WATCH_PLUGIN_FILES") == "1"
+_WATCH_TASK = None
+
+def _json_response(body, status=200):
+    return quart.Response(response=json.dumps(body), status=status, mimetype="application/json")
+
+def _is_todo_id(value):
+    # bool is a subclass of int, but true/false are not ids.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_todo_text(value):
+    return isinstance(value, str)
+
+def _is_todo_update(value):
+    return isinstance(value, dict) and _is_todo_id(value.get("id")) and _is_todo_text(value.get("todo"))
+
+def _body_error(body):
+    """Return a 400 response if the parsed request body is not a JSON object, else None."""
+    if not isinstance(body, dict):
+        return _json_response({"error": "Expected a JSON object."}, status=400)
+    return None
+
+def _batch_error(items, is_valid_item, expected):
+    """Return a 400 response if the batch is not a list of 1..MAX_BATCH_SIZE valid items, else None."""
+    if not isinstance(items, list) or not items:
+        return _json_response({"error": "Expected a non-empty list."}, status=400)
+    if len(items) > MAX_BATCH_SIZE:
+        return _json_response({"error": f"At most {MAX_BATCH_SIZE} items per batch."}, status=400)
+    for index, item in enumerate(items):
+        if not is_valid_item(item):
+            return _json_response({"error": f"Item {index} must be {expected}."}, status=400)
+    return None
+
+@app.before_serving
+async def startup():
+    global _WATCH_TASK
+    await _STORE.open()
+    if WATCH_PLUGIN_FILES:
+        _WATCH_TASK = asyncio.create_task(watch_assets([_MANIFEST, _OPENAPI_SPEC, _LOGO]))
+
+@app.after_serving
+async def shutdown():
+    if _WATCH_TASK is not None:
+        _WATCH_TASK.cancel()
+    await _STORE.close()
 
 @app.post("/todos/<string:username>")
 async def add_todo(username):
     request = await quart.request.get_json(force=True)
-    if username not in _TODOS:
-        _TODOS[username] = []
-    _TODOS[username].append(request["todo"])
-    return quart.Response(response='OK', status=200)
+    error = _body_error(request)
+    if error is not None:
+        return error
+    todo = request.get("todo")
+    if not _is_todo_text(todo):
+        return _json_response({"error": 'Expected a string "todo".'}, status=400)
+    todo_id = await _STORE.add(username, todo)
+    return _json_response({"id": todo_id})
 
 @app.get("/todos/<string:username>")
 async def get_todos(username):
-    return quart.Response(response=json.dumps(_TODOS.get(username, [])), status=200)
+    limit = min(quart.request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    cursor = quart.request.args.get("cursor", 0, type=int)
+    todos, next_cursor = await _STORE.list(username, limit=max(limit, 1), after_id=cursor)
+    return _json_response({"todos": todos, "next_cursor": next_cursor})
 
 @app.delete("/todos/<string:username>")
 async def delete_todo(username):
     request = await quart.request.get_json(force=True)
-    todo_idx = request["todo_idx"]
     # fail silently, it's a simple plugin
-    if 0 <= todo_idx < len(_TODOS[username]):
-        _TODOS[username].pop(todo_idx)
+    if "todo_id" in request:
+        await _STORE.delete(username, request["todo_id"])
+    else:
+        await _STORE.delete_at(username, request["todo_idx"])
     return quart.Response(response='OK', status=200)
 
+# Batch endpoints apply every item in a single transaction, so a whole batch costs one round trip.
+@app.post("/todos/<string:username>/batch")
+async def add_todos(username):
+    request = await quart.request.get_json(force=True)
+    error = _body_error(request)
+    if error is not None:
+        return error
+    todos = request.get("todos")
+    error = _batch_error(todos, _is_todo_text, "a string")
+    if error is not None:
+        return error
+    todo_ids = await _STORE.add_many(username, todos)
+    return _json_response({"ids": todo_ids})
+
+@app.patch("/todos/<string:username>/batch")
+async def update_todos(username):
+    request = await quart.request.get_json(force=True)
+    error = _body_error(request)
+    if error is not None:
+        return error
+    updates = request.get("updates")
+    error = _batch_error(updates, _is_todo_update, 'an object with an integer "id" and a string "todo"')
+    if error is not None:
+        return error
+    # A repeated id is applied once, with its last text.
+    texts = {update["id"]: update["todo"] for update in updates}
+    missing = await _STORE.update_many(username, texts)
+    return _json_response({"updated": len(texts) - len(missing), "missing_ids": missing})
+
+@app.delete("/todos/<string:username>/batch")
+async def delete_todos(username):
+    request = await quart.request.get_json(force=True)
+    error = _body_error(request)
+    if error is not None:
+        return error
+    todo_ids = request.get("todo_ids")
+    error = _batch_error(todo_ids, _is_todo_id, "an integer id")
+    if error is not None:
+        return error
+    # A repeated id is deleted once and not reported as missing the second time.
+    unique_ids = list(dict.fromkeys(todo_ids))
+    missing = await _STORE.delete_many(username, unique_ids)
+    return _json_response({"deleted": len(unique_ids) - len(missing), "missing_ids": missing})
+
 @app.get("/logo.png")
 async def plugin_logo():
-    filename = 'logo.png'
-    return await quart.send_file(filename, mimetype='image/png')
+    return _LOGO.response(request)
 
 @app.get("/.well-known/ai-plugin.json")
 async def plugin_manifest():
-    host = request.headers['Host']
-    with open("./.well-known/ai-plugin.json") as f:
-        text = f.read()
-        return quart.Response(text, mimetype="text/json")
+    return _MANIFEST.response(request)
 
 @app.get("/openapi.yaml")
 async def openapi_spec():
-    host = request.headers['Host']
-    with open("openapi.yaml") as f:
-        text = f.read()
-        return quart.Response(text, mimetype="text/yaml")
+    return _OPENAPI_SPEC.response(request)
 
 def main():
     app.run(debug=True, host="0.0.0.0", port=5003)
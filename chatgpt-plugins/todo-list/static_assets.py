@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import logging
+import os
+
+import quart
+
+logger = logging.getLogger(__name__)
+
+# How many Host-specific renderings of one asset to keep.
+MAX_RENDERED_HOSTS = 16
+
+
+class StaticAsset:
+    """A static file (plugin manifest, OpenAPI spec, logo) loaded into memory once.
+
+    - Requests never touch the disk; reload_if_changed() reloads after the file is edited.
+    - The origin baked into text files (e.g. http://localhost:5003) is replaced with the
+      requesting Host, and each rendering is cached per Host.
+    - Responses carry ETag and Cache-Control, and a matching If-None-Match gets a 304.
+    """
+
+    def __init__(self, path, mimetype, origin=None, max_age=3600):
+        self.path = path
+        self.mimetype = mimetype
+        self.origin = origin
+        self.max_age = max_age
+        self._mtime = None
+        self._rendered = {}
+        self.load()
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            self._body = f.read()
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self._rendered = {}
+
+    def reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        logger.info("Reloaded %s", self.path)
+        return True
+
+    def _render(self, request):
+        origin = f"{request.scheme}://{request.host}" if self.origin else None
+        rendered = self._rendered.get(origin)
+        if rendered is None:
+            body = self._body
+            if origin is not None:
+                body = body.replace(self.origin.encode("utf-8"), origin.encode("utf-8"))
+            rendered = (body, hashlib.sha1(body).hexdigest())
+            if len(self._rendered) >= MAX_RENDERED_HOSTS:
+                self._rendered.pop(next(iter(self._rendered)))
+            self._rendered[origin] = rendered
+        return rendered
+
+    def response(self, request):
+        body, etag = self._render(request)
+        headers = {"Cache-Control": f"public, max-age={self.max_age}"}
+        if etag in request.if_none_match:
+            response = quart.Response(b"", status=304, headers=headers)
+        else:
+            response = quart.Response(body, mimetype=self.mimetype, headers=headers)
+        response.set_etag(etag)
+        return response
+
+
+async def watch_assets(assets, interval=1.0):
+    """Poll file modification times and reload changed assets, so edits apply without a restart."""
+    while True:
+        await asyncio.sleep(interval)
+        for asset in assets:
+            asset.reload_if_changed()
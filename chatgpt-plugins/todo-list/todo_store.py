@@ -0,0 +1,117 @@
+import asyncio
+import contextlib
+from typing import Dict, List, Optional, Tuple
+
+import aiosqlite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    todo TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_todos_username_id ON todos (username, id);
+"""
+
+
+class TodoStore:
+    """SQLite-backed todo storage.
+
+    Every todo gets a stable integer id. The (username, id) index keeps per-user
+    listing, keyset paging and deletes O(log n) regardless of list size.
+    """
+
+    def __init__(self, db_path: str = "todos.db"):
+        self.db_path = db_path
+        self._db: Optional[aiosqlite.Connection] = None
+        # All requests share one connection, so reads and writes are serialized: a
+        # read must not interleave with an open transaction and see its uncommitted rows.
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def open(self):
+        self._lock = asyncio.Lock()
+        self._db = await aiosqlite.connect(self.db_path)
+        # WAL with synchronous=NORMAL turns each commit into an append instead of a full journal sync.
+        # It does not isolate reads here: those share the single connection and take the lock.
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.executescript(SCHEMA)
+        await self._db.commit()
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def add(self, username: str, todo: str) -> int:
+        return (await self.add_many(username, [todo]))[0]
+
+    async def add_many(self, username: str, todos: List[str]) -> List[int]:
+        """Add several todos in one transaction and return their ids in order."""
+        async with self._transaction():
+            ids = []
+            for todo in todos:
+                cursor = await self._db.execute("INSERT INTO todos (username, todo) VALUES (?, ?)", (username, todo))
+                ids.append(cursor.lastrowid)
+            return ids
+
+    async def list(self, username: str, limit: int = 100, after_id: int = 0) -> Tuple[List[dict], Optional[int]]:
+        """Return one page of todos ordered by id and the cursor for the next page (None on the last page)."""
+        async with self._lock:
+            async with self._db.execute(
+                "SELECT id, todo FROM todos WHERE username = ? AND id > ? ORDER BY id LIMIT ?",
+                (username, after_id, limit + 1),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        todos = [{"id": todo_id, "todo": todo} for todo_id, todo in rows[:limit]]
+        next_cursor = todos[-1]["id"] if len(rows) > limit else None
+        return todos, next_cursor
+
+    async def delete(self, username: str, todo_id: int) -> bool:
+        return not await self.delete_many(username, [todo_id])
+
+    async def delete_many(self, username: str, todo_ids: List[int]) -> List[int]:
+        """Delete several todos in one transaction and return the ids that did not exist."""
+        async with self._transaction():
+            missing = []
+            for todo_id in todo_ids:
+                cursor = await self._db.execute("DELETE FROM todos WHERE username = ? AND id = ?", (username, todo_id))
+                if cursor.rowcount == 0:
+                    missing.append(todo_id)
+            return missing
+
+    async def update_many(self, username: str, updates: Dict[int, str]) -> List[int]:
+        """Replace the text of several todos in one transaction and return the ids that did not exist."""
+        async with self._transaction():
+            missing = []
+            for todo_id, todo in updates.items():
+                cursor = await self._db.execute(
+                    "UPDATE todos SET todo = ? WHERE username = ? AND id = ?", (todo, username, todo_id)
+                )
+                if cursor.rowcount == 0:
+                    missing.append(todo_id)
+            return missing
+
+    async def delete_at(self, username: str, index: int) -> bool:
+        """Delete by position in the user's list, kept for clients that still send todo_idx."""
+        if index < 0:
+            return False
+        # A single statement, so a concurrent request cannot shift the position in between.
+        async with self._transaction():
+            cursor = await self._db.execute(
+                "DELETE FROM todos WHERE id = "
+                "(SELECT id FROM todos WHERE username = ? ORDER BY id LIMIT 1 OFFSET ?)",
+                (username, index),
+            )
+            return cursor.rowcount > 0
+
+    @contextlib.asynccontextmanager
+    async def _transaction(self):
+        """Commit everything executed inside the block, or roll all of it back on error."""
+        async with self._lock:
+            try:
+                yield
+            except BaseException:
+                await self._db.rollback()
+                raise
+            await self._db.commit()
@@ -0,0 +1,61 @@
+import csv
+import json
+import os
+import re
+import threading
+
+# 行政区划名称常见的后缀，查询时去掉，"上海市" 与 "上海" 视为同一个城市
+ADMIN_SUFFIXES = ("特别行政区", "自治州", "地区", "市")
+
+
+def normalize_city(name):
+    """去掉空白、标点和行政区划后缀，英文统一小写"""
+    name = re.sub(r"[\s,，.。·]+", "", name or "").lower()
+    for suffix in ADMIN_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix) + 1:
+            return name[:-len(suffix)]
+    return name
+
+
+class CityCodeCache:
+    """城市名到高德 adcode 的本地缓存。
+
+    启动时从随插件发布的地名表（gazetteer.csv）和之前地理编码得到的结果（cache_path）加载。
+    只做规范化后的精确匹配：名称相近的城市（如张家口与张家港）很常见，前缀或模糊匹配会
+    悄悄返回另一个城市的天气。未命中时调用地理编码接口，其结果通过 add() 写回磁盘。
+    """
+
+    def __init__(self, gazetteer_path="gazetteer.csv", cache_path="citycode_cache.json"):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._codes = {}
+        self._learned = {}
+
+        if os.path.exists(gazetteer_path):
+            with open(gazetteer_path, encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self._codes[normalize_city(row["name"])] = row["adcode"]
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                self._learned = json.load(f)
+            self._codes.update(self._learned)
+
+    def lookup(self, city):
+        name = normalize_city(city)
+        if not name:
+            return None
+        return self._codes.get(name)
+
+    def add(self, city, adcode):
+        """记录地理编码接口返回的结果，并原子地写回缓存文件"""
+        name = normalize_city(city)
+        with self._lock:
+            if self._codes.get(name) == adcode:
+                return
+            self._codes[name] = adcode
+            self._learned[name] = adcode
+
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._learned, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
@@ -1,9 +1,11 @@
+# 导入 asyncio 模块，用于限制并发和运行测试
+import asyncio
 # 导入 json 模块，用于 json 数据的序列化和反序列化
 import json
 # 导入 os 模块，用于获取第三方天气平台 API_KEY
 import os
-# 导入 requests 模块，用于访问第三方天气平台
-import requests
+# 导入 httpx 模块，用异步客户端访问第三方天气平台，不阻塞事件循环
+import httpx
 
 # 导入 quart 模块，用于构建异步 Web 应用
 import quart
@@ -12,12 +14,79 @@ import quart_cors
 # 从 quart 模块导入 request 对象，用于处理 HTTP 请求
 from quart import request
 
+# 导入城市名到 adcode 的本地缓存
+from citycode_cache import CityCodeCache
+# 导入带过期时间、合并并发请求的天气数据缓存
+from weather_cache import WeatherCache
+# 导入内存中的静态资源，避免每次请求都读磁盘
+from static_assets import StaticAsset, watch_assets
+
 # 创建一个支持 CORS 的 Quart 应用实例，允许来自 "https://chat.openai.com" 的跨域请求
 app = quart_cors.cors(quart.Quart(__name__), allow_origin="https://chat.openai.com")
 
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 
-def get_citycode(city):
+# 单次请求的超时时间（秒），连接阶段单独设置更短的超时
+AMAP_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+# 同时发往高德接口的最大请求数，超出的请求在本地排队
+MAX_UPSTREAM_CONCURRENCY = 50
+
+# 所有请求共享同一个客户端及其 keep-alive 连接池，在服务启动时创建
+_HTTP_CLIENT = None
+_UPSTREAM_SEMAPHORE = None
+
+# 城市对应的 adcode 几乎不会变化，预先从地名表加载，地理编码的结果也持久化到磁盘
+_CITY_CODES = CityCodeCache("gazetteer.csv", "citycode_cache.json")
+
+# 天气数据几分钟才更新一次，按城市和接口类型缓存完整的返回结果（秒）
+CURRENT_WEATHER_TTL = 600
+FORECAST_TTL = 1800
+_WEATHER_CACHE = WeatherCache()
+
+async def open_http_client():
+    global _HTTP_CLIENT, _UPSTREAM_SEMAPHORE
+    limits = httpx.Limits(max_connections=MAX_UPSTREAM_CONCURRENCY, max_keepalive_connections=MAX_UPSTREAM_CONCURRENCY)
+    _HTTP_CLIENT = httpx.AsyncClient(timeout=AMAP_TIMEOUT, limits=limits)
+    _UPSTREAM_SEMAPHORE = asyncio.Semaphore(MAX_UPSTREAM_CONCURRENCY)
+
+async def close_http_client():
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+async def _amap_get(url, params):
+    async with _UPSTREAM_SEMAPHORE:
+        response = await _HTTP_CLIENT.get(url, params=params)
+    response.raise_for_status()
+    # 上游返回非 JSON 内容时抛出 ValueError（JSONDecodeError），与 HTTP 错误一样由调用方处理
+    return response.json()
+
+async def _get_weather_data(citycode, extensions):
+    """获取城市的实况（base）或预报（all）数据，同一城市的并发请求只访问一次高德接口"""
+    url = "https://restapi.amap.com/v3/weather/weatherInfo"
+    params = {
+        "city": citycode,
+        "key": WEATHER_API_KEY,
+        "extensions": extensions
+    }
+
+    async def fetch():
+        data = await _amap_get(url, params)
+        # 高德在出错时也返回 200，status 不为 "1" 的结果不能缓存
+        if data.get("status") != "1":
+            raise httpx.HTTPError(f"amap error: {data.get('info')}")
+        return data
+
+    ttl = FORECAST_TTL if extensions == "all" else CURRENT_WEATHER_TTL
+    return await _WEATHER_CACHE.get_or_fetch((extensions, citycode), fetch, ttl)
+
+async def get_citycode(city):
+    # 先查本地缓存，命中时无需调用地理编码接口
+    citycode = _CITY_CODES.lookup(city)
+    if citycode is not None:
+        return citycode
+
     url = "https://restapi.amap.com/v3/geocode/geo"
     params = {
         "city": city,
@@ -26,57 +95,50 @@ def get_citycode(city):
     }
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
         # 从 response 中获取 citycode
-        data = response.json()
-        citycode = data["geocodes"][0]["adcode"]
+        data = await _amap_get(url, params)
+        # 城市不存在时 geocodes 为空；status 不为 "1" 时请求本身失败（如 key 无效），都按查不到处理
+        ok = isinstance(data, dict) and data.get("status") == "1"
+        geocodes = data.get("geocodes") if ok else None
+        if not geocodes or not isinstance(geocodes[0], dict) or not geocodes[0].get("adcode"):
+            print(f"Geocoding failed for {city}: {data.get('info') if isinstance(data, dict) else data}")
+            return None
+        citycode = geocodes[0]["adcode"]
         print(f"{city}: {citycode}")
+        await asyncio.to_thread(_CITY_CODES.add, city, citycode)
         return citycode
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error occurred during GET request: {e}")
         return None
 
 
-def _get_current_weather(city):
-    citycode = get_citycode(city)
-
-    url = "https://restapi.amap.com/v3/weather/weatherInfo"
-    params = {
-        "city": citycode,
-        "key": WEATHER_API_KEY,
-    }
+async def _get_current_weather(city):
+    citycode = await get_citycode(city)
+    if citycode is None:
+        return None
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await _get_weather_data(citycode, "base")
         # 从 response 中提取天气相关信息
         w = data["lives"][0]
         weather = f"今天{w['province']}{w['city']}天气{w['weather']}，温度{w['temperature']}°C，湿度{w['humidity']}%，风向{w['winddirection']}，风力{w['windpower']}。"
         return weather
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error occurred during GET request: {e}")
         return None
 
 
-def _get_n_day_weather_forecast(city, num_days):
+async def _get_n_day_weather_forecast(city, num_days):
     if num_days > 3 or num_days < 0:
         return "最多查询未来3天的预报"
    
-    citycode = get_citycode(city)
-
-    url = "https://restapi.amap.com/v3/weather/weatherInfo"
-    params = {
-        "city": citycode,
-        "key": WEATHER_API_KEY,
-        "extensions": "all"
-    }
+    citycode = await get_citycode(city)
+    if citycode is None:
+        return None
 
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        # 缓存的是完整的多日预报，不同的 num_days 都从同一份数据中取
+        data = await _get_weather_data(citycode, "all")
         # 从 response 中提取天气相关信息
         forecast = data["forecasts"][0]["casts"][num_days]
         date = forecast["date"]
@@ -92,11 +154,33 @@ def _get_n_day_weather_forecast(city, num_days):
         weather = f"{date}，白天天气{day_weather}，夜晚天气{night_weather}，白天温度{day_temp}°C，夜晚温度{night_temp}°C，白天风向{day_wind}，夜晚风向{night_wind}，白天风力{day_power}，夜晚风力{night_power}。"
 
         return weather
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, ValueError) as e:
         print(f"Error occurred during GET request: {e}")
         return None
 
 
+# 插件清单、OpenAPI 描述与图标在启动时读入内存，清单中的 origin 按请求的 Host 替换
+PLUGIN_ORIGIN = "http://localhost:5002"
+_MANIFEST = StaticAsset("./.well-known/ai-plugin.json", "text/json", origin=PLUGIN_ORIGIN)
+_OPENAPI_SPEC = StaticAsset("openapi.yaml", "text/yaml", origin=PLUGIN_ORIGIN)
+_LOGO = StaticAsset("weather-forecast.png", "image/png", max_age=86400)
+# 设置环境变量 WATCH_PLUGIN_FILES=1 时，文件修改后自动重新加载
+WATCH_PLUGIN_FILES = os.getenv("WATCH_PLUGIN_FILES") == "1"
+_WATCH_TASK = None
+
+# 服务启动时创建共享的 HTTP 客户端，关闭时释放连接池
+@app.before_serving
+async def startup():
+    global _WATCH_TASK
+    await open_http_client()
+    if WATCH_PLUGIN_FILES:
+        _WATCH_TASK = asyncio.create_task(watch_assets([_MANIFEST, _OPENAPI_SPEC, _LOGO]))
+
+@app.after_serving
+async def shutdown():
+    if _WATCH_TASK is not None:
+        _WATCH_TASK.cancel()
+    await close_http_client()
 
 # 定义一个路由处理器，处理 GET 请求，路由为 "/weather/current"
 @app.get("/weather/current")
@@ -104,7 +188,10 @@ async def get_current_weather():
     # 从请求参数中获取城市名
     city = request.args.get("city")
     
-    response = _get_current_weather(city)
+    response = await _get_current_weather(city)
+    if response is None:
+        # 城市查不到或高德接口出错
+        return quart.Response(json.dumps({"error": f"无法获取{city}的天气信息"}, ensure_ascii=False), status=502)
     # 创建并返回一个 Quart 响应对象，状态码为 200，响应体为 response 的 json 形式
     return quart.Response(json.dumps(response), status=200)
 
@@ -115,7 +202,10 @@ async def get_n_day_weather_forecast():
     city = request.args.get("city")
     num_days = int(request.args.get("num_days"))
 
-    response = _get_n_day_weather_forecast(city, num_days)
+    response = await _get_n_day_weather_forecast(city, num_days)
+    if response is None:
+        # 城市查不到或高德接口出错
+        return quart.Response(json.dumps({"error": f"无法获取{city}的天气信息"}, ensure_ascii=False), status=502)
     # 创建并返回一个 Quart 响应对象，状态码为 200，响应体为 response 的 json 形式
     return quart.Response(json.dumps(response), status=200)
 
@@ -123,32 +213,20 @@ async def get_n_day_weather_forecast():
 # 定义一个路由处理器，处理 GET 请求，路由为 "/logo.png"
 @app.get("/logo.png")
 async def plugin_logo():
-    # 文件名为 'weather-forecast.png'
-    filename = 'weather-forecast.png'
-    # 使用 quart.send_file 方法发送文件，并指定 MIME 类型为 'image/png'
-    return await quart.send_file(filename, mimetype='image/png')
+    # 返回内存中的 'weather-forecast.png'，带缓存头
+    return _LOGO.response(request)
 
 # 定义一个路由处理器，处理 GET 请求，路由为 "/.well-known/ai-plugin.json"
 @app.get("/.well-known/ai-plugin.json")
 async def plugin_manifest():
-    # 从请求头中获取主机名
-    host = request.headers['Host']
-    # 打开并读取 ai-plugin.json 文件
-    with open("./.well-known/ai-plugin.json") as f:
-        text = f.read()
-    # 返回一个 Quart 响应对象，响应体为 text，MIME 类型为 "text/json"
-    return quart.Response(text, mimetype="text/json")
+    # 返回按请求 Host 渲染的 ai-plugin.json，MIME 类型为 "text/json"
+    return _MANIFEST.response(request)
 
 # 定义一个路由处理器，处理 GET 请求，路由为 "/openapi.yaml"
 @app.get("/openapi.yaml")
 async def openapi_spec():
-    # 从请求头中获取主机名
-    host = request.headers['Host']
-    # 打开并读取 openapi.yaml 文件
-    with open("openapi.yaml") as f:
-        text = f.read()
-    # 返回一个 Quart 响应对象，响应体为 text，MIME 类型为 "text/yaml"
-    return quart.Response(text, mimetype="text/yaml")
+    # 返回按请求 Host 渲染的 openapi.yaml，MIME 类型为 "text/yaml"
+    return _OPENAPI_SPEC.response(request)
 
 # 定义 main 函数，运行 Quart 应用
 def main():
@@ -156,16 +234,18 @@ def main():
     app.run(debug=True, host="0.0.0.0", port=5002)
     
 
-def test():
+async def test():
+    await open_http_client()
     city = "上海"
     num_days = 2
-    weather_info = _get_current_weather(city)
+    weather_info = await _get_current_weather(city)
     print(weather_info)
 
-    weather_forecast = _get_n_day_weather_forecast(city, num_days)
+    weather_forecast = await _get_n_day_weather_forecast(city, num_days)
     print(weather_forecast)
+    await close_http_client()
 
 # 如果该文件是直接运行的，而不是作为模块导入的，则调用 main 函数
 if __name__ == "__main__":
-    test()
+    asyncio.run(test())
     main()
\ No newline at end of file
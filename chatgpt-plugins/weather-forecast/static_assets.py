@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import logging
+import os
+
+import quart
+
+logger = logging.getLogger(__name__)
+
+# 每个资源最多缓存这么多个不同 Host 渲染出的版本
+MAX_RENDERED_HOSTS = 16
+
+
+class StaticAsset:
+    """启动时读入内存的静态文件（插件清单、OpenAPI 描述、图标）。
+
+    - 请求时不再读磁盘；reload_if_changed() 在文件修改后重新加载；
+    - 文本文件中的 origin（如 http://localhost:5002）按请求的 Host 替换，渲染结果按 Host 缓存；
+    - 响应带 ETag 与 Cache-Control，If-None-Match 命中时返回 304。
+    """
+
+    def __init__(self, path, mimetype, origin=None, max_age=3600):
+        self.path = path
+        self.mimetype = mimetype
+        self.origin = origin
+        self.max_age = max_age
+        self._mtime = None
+        self._rendered = {}
+        self.load()
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            self._body = f.read()
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self._rendered = {}
+
+    def reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        logger.info("Reloaded %s", self.path)
+        return True
+
+    def _render(self, request):
+        origin = f"{request.scheme}://{request.host}" if self.origin else None
+        rendered = self._rendered.get(origin)
+        if rendered is None:
+            body = self._body
+            if origin is not None:
+                body = body.replace(self.origin.encode("utf-8"), origin.encode("utf-8"))
+            rendered = (body, hashlib.sha1(body).hexdigest())
+            if len(self._rendered) >= MAX_RENDERED_HOSTS:
+                self._rendered.pop(next(iter(self._rendered)))
+            self._rendered[origin] = rendered
+        return rendered
+
+    def response(self, request):
+        body, etag = self._render(request)
+        headers = {"Cache-Control": f"public, max-age={self.max_age}"}
+        if etag in request.if_none_match:
+            response = quart.Response(b"", status=304, headers=headers)
+        else:
+            response = quart.Response(body, mimetype=self.mimetype, headers=headers)
+        response.set_etag(etag)
+        return response
+
+
+async def watch_assets(assets, interval=1.0):
+    """定期检查文件修改时间，文件变化后重新加载，用于开发时修改清单无需重启"""
+    while True:
+        await asyncio.sleep(interval)
+        for asset in assets:
+            asset.reload_if_changed()
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+
+class WeatherCache:
+    """带过期时间的天气数据缓存。
+
+    同一个 key 的缓存未命中时，并发请求只会触发一次上游请求（single-flight），
+    其余请求等待同一个结果；请求失败不缓存，下一次请求会重新获取。
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._inflight = {}
+
+    async def get_or_fetch(self, key, fetch, ttl):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if time.monotonic() < expires_at:
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, fetch, ttl))
+            self._inflight[key] = task
+        # 某个等待者被取消时，不影响其他等待同一结果的请求
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, fetch, ttl):
+        try:
+            value = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+
+        if len(self._entries) >= self.max_entries:
+            # 按写入顺序淘汰最早的条目
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (value, time.monotonic() + ttl)
+        return value
@@ -1,27 +1,80 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from typing import Any, List, Optional
+
 import gradio as gr
 
 from langchain_community.llms import ChatGLM
 from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
+
+from glm_dispatcher import GLMDispatcher
+from session_memory import SessionMemoryManager, approximate_token_ids
+from session_store import SQLiteSessionStore
 
 CHATGLM_URL = "http://127.0.0.1:8001"
+# 会话状态保存在 SQLite 中，多个 Web UI 进程共享同一个文件即可共享会话
+SESSION_DB = "chatglm_sessions.db"
+# 同时发往 ChatGLM 服务的最大请求数，按 GPU 服务的最佳吞吐点设置
+CHATGLM_MAX_CONCURRENCY = 2
+# 每隔多少秒在 INFO 级别输出一次调度器的排队深度和等待时间
+DISPATCHER_STATS_INTERVAL = 60
+
+# 当前请求所属的 Gradio 会话，调度器据此在会话之间公平排队
+CURRENT_SESSION = contextvars.ContextVar("chatglm_session", default="default")
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchedChatGLM(ChatGLM):
+    """经由 GLMDispatcher 发送请求的 ChatGLM：限制并发、按会话公平排队，并合并相同的提示词"""
+
+    dispatcher: GLMDispatcher
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        key = json.dumps([prompt, stop, kwargs], ensure_ascii=False, sort_keys=True, default=str)
+        request = functools.partial(super()._call, prompt, stop, run_manager, **kwargs)
+        return self.dispatcher.call(request, session_id=CURRENT_SESSION.get(), key=key)
+
+
+def log_dispatcher_stats(dispatcher: GLMDispatcher, interval: float = DISPATCHER_STATS_INTERVAL):
+    """后台线程定期输出调度器统计，不占用每轮对话的请求路径"""
+    def run():
+        while True:
+            time.sleep(interval)
+            logger.info("dispatcher stats: %s", dispatcher.stats())
+
+    threading.Thread(target=run, name="glm-dispatcher-stats", daemon=True).start()
+
 
 def init_chatbot():
-    llm = ChatGLM(
+    llm = DispatchedChatGLM(
+        dispatcher=GLMDispatcher(max_concurrency=CHATGLM_MAX_CONCURRENCY),
         endpoint_url=CHATGLM_URL,
         max_token=80000,
         history=[],
         top_p=0.9,
         model_kwargs={"sample_model_args": False},
+        custom_get_token_ids=approximate_token_ids,
     )
-    global CHATGLM_CHATBOT
-    CHATGLM_CHATBOT = ConversationChain(llm=llm, 
-                                        verbose=True,
-                                        memory=ConversationBufferMemory())
-    return CHATGLM_CHATBOT
-
-def chatglm_chat(message, history):
-    ai_message = CHATGLM_CHATBOT.predict(input = message)
+    global CHATGLM_LLM, CHATGLM_MEMORIES
+    CHATGLM_LLM = llm
+    log_dispatcher_stats(llm.dispatcher)
+    # 每个 Gradio 会话拥有独立的、长度受限并滚动总结的对话记忆
+    CHATGLM_MEMORIES = SessionMemoryManager(llm, store=SQLiteSessionStore(SESSION_DB))
+    return CHATGLM_LLM
+
+def chatglm_chat(message, history, request: gr.Request):
+    CURRENT_SESSION.set(request.session_hash)
+    memory = CHATGLM_MEMORIES.get(request.session_hash)
+    chatbot = ConversationChain(llm=CHATGLM_LLM,
+                                verbose=True,
+                                memory=memory)
+    ai_message = chatbot.predict(input = message)
+    CHATGLM_MEMORIES.save(request.session_hash, memory)
     return ai_message
 
 def launch_gradio():
@@ -34,6 +87,7 @@ def launch_gradio():
     demo.launch(share=True, server_name="0.0.0.0")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     # 初始化聊天机器人
     init_chatbot()
     # 启动 Gradio 服务
@@ -0,0 +1,47 @@
+import re
+from typing import List, Optional
+
+from langchain.memory import ChatMessageHistory, ConversationSummaryBufferMemory
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+from session_store import InMemorySessionStore, SessionStore
+
+# 汉字按一个 token 计，其余字符约 4 个一个 token
+CJK_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+
+
+def approximate_token_ids(text: str) -> List[int]:
+    """粗略估算 ChatGLM 的 token 数，只用于控制记忆长度，避免客户端依赖模型的 tokenizer"""
+    cjk = len(CJK_PATTERN.findall(text))
+    return [0] * (cjk + (len(text) - cjk + 3) // 4)
+
+
+class SessionMemoryManager:
+    """按 Gradio 会话隔离的对话记忆。
+
+    每个会话只保留最近 max_token_limit 个 token 的原始对话，更早的轮次由大模型滚动总结为摘要，
+    每轮发送给 ChatGLM 的提示词长度不再随对话轮数增长。
+
+    会话状态（摘要 + 最近几轮对话）保存在 SessionStore 中：每轮对话前从存储加载，结束后写回，
+    使用 SQLiteSessionStore 时多个 Web UI 进程可以共享会话。
+    """
+
+    def __init__(self, llm, store: Optional[SessionStore] = None, max_token_limit: int = 1024):
+        self.llm = llm
+        self.store = store or InMemorySessionStore()
+        self.max_token_limit = max_token_limit
+
+    def get(self, session_id: str) -> ConversationSummaryBufferMemory:
+        memory = ConversationSummaryBufferMemory(llm=self.llm, max_token_limit=self.max_token_limit)
+        state = self.store.load(session_id)
+        if state:
+            memory.moving_summary_buffer = state["summary"]
+            memory.chat_memory = ChatMessageHistory(messages=messages_from_dict(state["messages"]))
+        return memory
+
+    def save(self, session_id: str, memory: ConversationSummaryBufferMemory):
+        # memory 在每轮结束时已经裁剪过，只需保存摘要和窗口内的对话
+        self.store.save(session_id, {
+            "summary": memory.moving_summary_buffer,
+            "messages": messages_to_dict(memory.chat_memory.messages),
+        })
@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """会话状态存储接口。会话状态是一个可 JSON 序列化的字典：
+    {"summary": 滚动摘要, "messages": 最近几轮的原始对话}
+    """
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        raise NotImplementedError("子类必须实现 load 方法")
+
+    def save(self, session_id: str, state: Dict):
+        raise NotImplementedError("子类必须实现 save 方法")
+
+    def delete(self, session_id: str):
+        raise NotImplementedError("子类必须实现 delete 方法")
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """进程内存储，只适用于单进程部署；会话数超过上限或长时间未活动时被淘汰"""
+
+    def __init__(self, idle_timeout: float = 1800, max_sessions: int = 1000):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._sessions.get(session_id)
+            return entry[0] if entry else None
+
+    def save(self, session_id: str, state: Dict):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session_id] = (state, time.monotonic())
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict_idle(self, now: float):
+        # 会话按最近活动时间排序，从最旧的开始检查即可
+        while self._sessions:
+            session_id, (_, last_active) = next(iter(self._sessions.items()))
+            if now - last_active <= self.idle_timeout:
+                break
+            del self._sessions[session_id]
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite 存储，多个 Web UI 进程可以共享同一个数据库文件，重启后会话仍然保留。
+
+    按会话 id 主键查询；写入先合并在内存中（同一会话只保留最新状态），
+    由后台线程每隔 flush_interval 秒在一个事务里批量写入，同时清理超时的会话。
+    """
+
+    def __init__(self, db_path: str = "chatglm_sessions.db", idle_timeout: float = 1800, flush_interval: float = 0.5):
+        self.idle_timeout = idle_timeout
+        self.flush_interval = flush_interval
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        # WAL 模式下多个进程读写互不阻塞
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)")
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Optional[str]] = {}
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._run, name="session-store-flusher", daemon=True)
+        self._flusher.start()
+        # 正常退出时写入最后一个 flush_interval 内的会话
+        atexit.register(self.close)
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            if session_id in self._pending:
+                state = self._pending[session_id]
+                return json.loads(state) if state is not None else None
+            row = self._conn.execute(
+                "SELECT state FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.idle_timeout),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, session_id: str, state: Dict):
+        with self._lock:
+            self._pending[session_id] = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._pending[session_id] = None
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            # 写入成功后才清空；写入失败时这些状态留在 _pending 中，下一次 flush 重试
+            pending = self._pending
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)",
+                    [(session_id, state, now) for session_id, state in pending.items() if state is not None],
+                )
+                self._conn.executemany(
+                    "DELETE FROM sessions WHERE session_id = ?",
+                    [(session_id,) for session_id, state in pending.items() if state is None],
+                )
+                self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.idle_timeout,))
+            self._pending = {}
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        atexit.unregister(self.close)
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+        self._conn.close()
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # 写入失败（如数据库被锁、磁盘已满）不能让后台线程退出，否则之后的会话都不再落盘
+                logger.exception("Failed to flush %d session(s)", len(self._pending))
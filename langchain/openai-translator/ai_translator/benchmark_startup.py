@@ -0,0 +1,57 @@
+"""测量 main.py 的启动耗时，并检查解析命令行后已经加载了哪些重量级模块。
+
+短任务和按请求启动的工作进程，耗时主要花在导入上；修改导入结构后可用本脚本对比。
+
+用法：
+    python ai_translator/benchmark_startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+HEAVY_MODULES = ["pandas", "numpy", "PIL.Image", "pdfplumber", "reportlab", "langchain", "langchain_openai", "zhipuai",
+                 "pydantic", "requests", "yaml", "loguru"]
+
+# 在子进程中以 --help 运行 main.py，退出后打印已经导入的重量级模块
+PROBE = """
+import runpy, sys
+sys.argv = [{main!r}, "--help"]
+try:
+    runpy.run_path({main!r}, run_name="__main__")
+except SystemExit:
+    pass
+print("LOADED:" + ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def loaded_heavy_modules():
+    probe = PROBE.format(main=MAIN, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True).stdout
+    line = next((line for line in output.splitlines() if line.startswith("LOADED:")), "LOADED:")
+    return [module for module in line[len("LOADED:"):].split(",") if module]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="测量翻译工具命令行的启动耗时")
+    parser.add_argument("--runs", type=int, default=10, help="每个命令运行的次数")
+    args = parser.parse_args()
+
+    for name, command in [("python -c pass", [sys.executable, "-c", "pass"]),
+                          ("main.py --help", [sys.executable, MAIN, "--help"])]:
+        timings = time_command(command, args.runs)
+        print(f"{name:<16} min {min(timings):7.1f} ms   median {statistics.median(timings):7.1f} ms")
+
+    print(f"heavy modules loaded by --help: {loaded_heavy_modules() or 'none'}")
@@ -1,3 +1,6 @@
+import json
+import re
+import numpy as np
 import pandas as pd
 
 from enum import Enum, auto
@@ -5,6 +8,12 @@ from PIL import Image as PILImage
 from utils import LOG
 from io import StringIO
 
+# 单元格数量超过该值时，结构化模式只发送去重后的单元格文本
+DEDUP_MIN_CELLS = 64
+
+# 模型有时会在表格后追加统计信息（如"3行x4列"），这些行需要丢弃
+TABLE_METADATA_MARKERS = ['行x', '列]', '行 x', 'rows', 'columns']
+
 class ContentType(Enum):
     TEXT = auto()
     TABLE = auto()
@@ -18,6 +27,13 @@ class Content:
         self.status = False
 
     def set_translation(self, translation, status):
+        self.translation, self.status = self.parse_translation(translation, status)
+
+    def parse_translation(self, translation, status):
+        """校验并清理模型返回的译文，返回 (translation, status)，不修改 Content 本身。
+
+        多语言翻译时各语言共享同一个 Content，译文保存在各自的 TranslationLayer 中。
+        """
         if not self.check_translation_type(translation):
             raise ValueError(f"Invalid translation type. Expected {self.content_type}, but got {type(translation)}")
         
@@ -35,8 +51,7 @@ class Content:
                 if translation.startswith(prefix):
                     translation = translation[len(prefix):].strip()
         
-        self.translation = translation
-        self.status = status
+        return translation, status
 
     def check_translation_type(self, translation):
         if self.content_type == ContentType.TEXT and isinstance(translation, str):
@@ -61,12 +76,13 @@ class TableContent(Content):
         
         super().__init__(ContentType.TABLE, df)
 
-    def set_translation(self, translation, status):
+    def parse_translation(self, translation, status):
         try:
             if not isinstance(translation, str):
                 raise ValueError(f"Invalid translation type. Expected str, but got {type(translation)}")
 
-            LOG.debug(f"[translation]\n{translation}")
+            if LOG.enabled("DEBUG"):
+                LOG.debug(f"[translation]\n{translation}")
             
             # 移除常见的模型响应前缀
             prefixes = [
@@ -83,9 +99,7 @@ class TableContent(Content):
             # 检查结果是否包含表格数据
             if "[" not in translation or "]" not in translation:
                 LOG.error("Translation result does not contain valid table data")
-                self.translation = None
-                self.status = False
-                return
+                return None, False
                 
             # 提取表格数据
             try:
@@ -143,28 +157,66 @@ class TableContent(Content):
                 
                 # 清理数据：移除表格统计或元数据行
                 # 如果有任何行包含"行x"或"列"等词语，可能是表格的元数据信息，应该移除
-                rows_to_drop = []
-                for idx, row in translated_df.iterrows():
-                    row_data = ' '.join(str(x) for x in row.values)
-                    if any(x in row_data for x in ['行x', '列]', '行 x', 'rows', 'columns']):
-                        rows_to_drop.append(idx)
+                pattern = "|".join(re.escape(marker) for marker in TABLE_METADATA_MARKERS)
+                is_metadata = translated_df.astype(str).apply(lambda col: col.str.contains(pattern)).any(axis=1)
+                translated_df = translated_df[~is_metadata]
                 
-                if rows_to_drop:
-                    translated_df = translated_df.drop(rows_to_drop)
+                if LOG.enabled("DEBUG"):
+                    LOG.debug(f"[translated_df]\n{translated_df}")
                 
-                LOG.debug(f"[translated_df]\n{translated_df}")
-                
-                self.translation = translated_df
-                self.status = status
+                return translated_df, status
             except Exception as inner_e:
                 LOG.error(f"Error parsing table data: {inner_e}")
-                self.translation = None
-                self.status = False
+                return None, False
                 
         except Exception as e:
             LOG.error(f"An error occurred during table translation: {e}")
-            self.translation = None
-            self.status = False
+            return None, False
+
+    def set_structured_translation(self, translation, status):
+        """解析结构化模式下模型返回的 JSON，并用向量化操作重建译文表格。
+
+        Returns:
+            bool: 回复是否通过校验。校验失败时调用方可以回退到文本模式。
+        """
+        self.translation, self.status = self.parse_structured_translation(translation, status)
+        return self.status
+
+    def parse_structured_translation(self, translation, status):
+        """与 set_structured_translation 相同，但只返回 (translation, status)，不修改 TableContent"""
+        try:
+            if not status or not isinstance(translation, str):
+                raise ValueError("Empty or invalid structured table translation")
+
+            if LOG.enabled("DEBUG"):
+                LOG.debug(f"[structured translation]\n{translation}")
+            payload = self._load_json_reply(translation)
+
+            original = self._original_cells().to_numpy()
+            if self._use_dedup(original):
+                # 按原文单元格的编码把去重后的译文回填到整张表
+                codes, uniques = pd.factorize(original.ravel())
+                cells = self._validate_cells(payload.get("cells"), len(uniques))
+                values = np.asarray(cells, dtype=object)[codes].reshape(original.shape)
+            else:
+                rows = payload.get("rows")
+                if not isinstance(rows, list) or len(rows) != original.shape[0]:
+                    raise ValueError(f"Expected {original.shape[0]} rows in structured reply")
+                values = np.empty(original.shape, dtype=object)
+                for row_idx, row in enumerate(rows):
+                    values[row_idx] = self._validate_cells(row, original.shape[1])
+
+            # 原文中的空单元格保持为空
+            values[original == ""] = ""
+
+            translated_df = pd.DataFrame(values[1:], columns=values[0])
+            if LOG.enabled("DEBUG"):
+                LOG.debug(f"[translated_df]\n{translated_df}")
+
+            return translated_df, True
+        except ValueError as e:
+            LOG.warning(f"Invalid structured table translation: {e}")
+            return None, False
 
     def __str__(self):
         return self.original.to_string(header=False, index=False)
@@ -180,4 +232,45 @@ class TableContent(Content):
         target_df.at[row_idx, col_idx] = new_value
 
     def get_original_as_str(self):
-        return self.original.to_string(header=False, index=False)
\ No newline at end of file
+        return self.original.to_string(header=False, index=False)
+
+    def get_original_as_json(self):
+        """将表格序列化为紧凑 JSON，供结构化翻译模式使用。
+
+        小表格按行发送 {"rows": [[...], ...]}，保留上下文；单元格数量超过
+        DEDUP_MIN_CELLS 时只发送去重后的单元格 {"cells": [...]}。
+        """
+        original = self._original_cells().to_numpy()
+        if self._use_dedup(original):
+            _, uniques = pd.factorize(original.ravel())
+            payload = {"cells": list(uniques)}
+        else:
+            payload = {"rows": original.tolist()}
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+    def _original_cells(self):
+        return self.original.fillna("").astype(str)
+
+    @staticmethod
+    def _use_dedup(cells):
+        return cells.size > DEDUP_MIN_CELLS
+
+    @staticmethod
+    def _load_json_reply(translation):
+        # 兼容模型在 JSON 外包裹 ```json 代码块或多余说明文字的情况
+        start = translation.find("{")
+        end = translation.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("Structured reply does not contain a JSON object")
+        payload = json.loads(translation[start:end + 1])
+        if not isinstance(payload, dict):
+            raise ValueError("Structured reply must be a JSON object")
+        return payload
+
+    @staticmethod
+    def _validate_cells(cells, expected_len):
+        if not isinstance(cells, list) or len(cells) != expected_len:
+            raise ValueError(f"Expected a list of {expected_len} cells in structured reply")
+        if not all(isinstance(cell, (str, int, float)) for cell in cells):
+            raise ValueError("Structured reply cells must be scalar values")
+        return [str(cell) for cell in cells]
@@ -0,0 +1,20 @@
+from typing import Any, Dict, Tuple
+
+from .content import Content
+
+class TranslationLayer:
+    """某一目标语言的译文层。
+
+    一本书解析一次后，每种目标语言各有一层，译文与状态按 Content 保存在层中，
+    不修改共享 Book 里的 Content.translation，多种语言可以并发翻译同一个 Book。
+    """
+    def __init__(self, target_language: str):
+        self.target_language = target_language
+        self._entries: Dict[int, Tuple[Any, bool]] = {}
+
+    def set_translation(self, content: Content, translation, status: bool):
+        self._entries[id(content)] = (translation, status)
+
+    def get_translation(self, content: Content) -> Tuple[Any, bool]:
+        """返回 (translation, status)，未翻译的内容返回 (None, False)"""
+        return self._entries.get(id(content), (None, False))
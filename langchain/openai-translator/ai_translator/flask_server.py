@@ -59,6 +59,7 @@ def initialize_translator():
     # 初始化配置单例
     config = TranslationConfig()
     config.initialize(args)    
+    LOG.configure(**(getattr(config, 'logging', None) or {}))
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
     global Translator
     Translator = PDFTranslator(config.model_name)
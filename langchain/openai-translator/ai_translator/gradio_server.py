@@ -86,6 +86,7 @@ def initialize_translator():
     # 初始化配置单例
     config = TranslationConfig()
     config.initialize(args)    
+    LOG.configure(**(getattr(config, 'logging', None) or {}))
     
     # 检查是否有ChatGLM API密钥参数
     if hasattr(args, 'zhipuai_api_key') and args.zhipuai_api_key:
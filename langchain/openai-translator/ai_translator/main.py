@@ -3,14 +3,16 @@ import os
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils import ArgumentParser, LOG
-from translator import PDFTranslator, TranslationConfig
+from utils import ArgumentParser, Glossary, LOG
 
 if __name__ == "__main__":
     # 解析命令行
     argument_parser = ArgumentParser()
     args = argument_parser.parse_arguments()
 
+    # 解析完命令行再导入翻译流程依赖的模块，--help 和参数错误可以立即返回
+    from translator import PDFTranslator, TranslationConfig, TranslationMemory
+
     # 如果提供了ChatGLM API密钥，则设置环境变量
     if hasattr(args, 'zhipuai_api_key') and args.zhipuai_api_key:
         os.environ['ZHIPUAI_API_KEY'] = args.zhipuai_api_key
@@ -19,7 +21,24 @@ if __name__ == "__main__":
     # 初始化配置单例
     config = TranslationConfig()
     config.initialize(args)    
+    LOG.configure(**(getattr(config, 'logging', None) or {}))
+
+    # 配置了翻译记忆库时，复用历史译文
+    translation_memory_path = getattr(config, 'translation_memory_path', None)
+    translation_memory = TranslationMemory(translation_memory_path) if translation_memory_path else None
+
+    # 加载术语表，翻译时只注入命中的术语
+    glossary_file = getattr(config, 'glossary_file', None)
+    glossary = Glossary.from_file(glossary_file) if glossary_file else None
 
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    translator = PDFTranslator(config.model_name)
-    translator.translate_pdf(config.input_file, config.output_file_format, pages=None)
+    translator = PDFTranslator(config.model_name, translation_memory=translation_memory, glossary=glossary,
+                               backends=getattr(config, 'backends', None))
+    target_languages = getattr(config, 'target_languages', None)
+    if target_languages:
+        output_files = translator.translate_pdf_multi(config.input_file, target_languages, config.output_file_format,
+                                                      source_language=config.source_language, pages=None,
+                                                      table_mode=getattr(config, 'table_mode', 'structured'))
+        LOG.info(f"多语言翻译完成: {output_files}")
+    else:
+        translator.translate_pdf(config.input_file, config.output_file_format, pages=None, table_mode=getattr(config, 'table_mode', 'structured'))
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+from utils import LOG
+
+
+class BackendStats:
+    """记录单个后端的延迟分布与健康状态"""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.ewma = None
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_success(self, latency: float, alpha: float = 0.3):
+        self.latencies.append(latency)
+        self.ewma = latency if self.ewma is None else alpha * latency + (1 - alpha) * self.ewma
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    def record_failure(self, cooldown: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        # 连续失败时冷却时间指数增长，最多 8 倍
+        backoff = min(2 ** (self.consecutive_failures - 1), 8)
+        self.unhealthy_until = time.monotonic() + cooldown * backoff
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def p95(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class ModelRouter:
+    """在多个模型后端之间路由请求，对外提供与 ZhipuAIModel 相同的 generate 接口。
+
+    每次请求发送给健康且平均延迟最低的后端；开启 hedge 后，如果该后端在其
+    p95 延迟内还没有返回，会向下一个后端发送一个重复请求，取先返回的结果。
+    请求失败的后端会被暂时摘除，并自动切换到下一个后端。
+    """
+
+    def __init__(self, backends: Dict[str, Any], hedge: bool = True, hedge_min_delay: float = 1.0,
+                 hedge_initial_delay: float = 10.0, failure_cooldown: float = 30.0, max_workers: int = 8):
+        if not backends:
+            raise ValueError("ModelRouter requires at least one backend")
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_initial_delay = hedge_initial_delay
+        self.failure_cooldown = failure_cooldown
+        self.stats = {name: BackendStats() for name in backends}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-router")
+
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        return self._dispatch(lambda backend: backend.generate(messages))
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                name: {
+                    "healthy": stats.is_healthy(),
+                    "ewma": stats.ewma,
+                    "p95": stats.p95(),
+                    "successes": stats.successes,
+                    "failures": stats.failures,
+                }
+                for name, stats in self.stats.items()
+            }
+
+    def _dispatch(self, call):
+        candidates = self._rank_backends()
+        pending = {}
+        errors = []
+
+        def launch():
+            name = candidates.pop(0)
+            pending[self._executor.submit(self._timed_call, name, call)] = name
+            return name
+
+        primary = launch()
+        while pending:
+            timeout = self._hedge_delay(primary) if self.hedge and candidates else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 当前后端超过 p95 延迟仍未返回，向下一个后端发送重复请求
+                LOG.debug(f"Hedging request: {primary} is slow, sending duplicate to {candidates[0]}")
+                primary = launch()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    LOG.warning(f"Backend {name} failed: {e}")
+                    # 自动故障转移到下一个后端
+                    if candidates:
+                        primary = launch()
+                    continue
+                # 已有后端返回结果，取消尚未开始的重复请求；已在执行的请求无法中断，其结果被丢弃
+                for other in pending:
+                    other.cancel()
+                return result
+
+        raise Exception(f"所有模型后端均请求失败：{'; '.join(errors)}")
+
+    def _timed_call(self, name, call):
+        start = time.monotonic()
+        try:
+            result = call(self.backends[name])
+        except Exception:
+            with self._lock:
+                self.stats[name].record_failure(self.failure_cooldown)
+            raise
+        with self._lock:
+            self.stats[name].record_success(time.monotonic() - start)
+        return result
+
+    def _rank_backends(self):
+        with self._lock:
+            healthy = [name for name, stats in self.stats.items() if stats.is_healthy()]
+            if not healthy:
+                # 没有健康的后端时，按最早恢复的顺序全部尝试
+                return sorted(self.stats, key=lambda name: self.stats[name].unhealthy_until)
+            # 尚无延迟数据的后端排在前面，以便尽快采集到延迟
+            return sorted(healthy, key=lambda name: self.stats[name].ewma or 0.0)
+
+    def _hedge_delay(self, name):
+        with self._lock:
+            p95 = self.stats[name].p95()
+        # 还没有延迟样本时使用较保守的初始等待时间
+        return max(p95 if p95 is not None else self.hedge_initial_delay, self.hedge_min_delay)
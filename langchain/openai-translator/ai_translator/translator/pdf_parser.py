@@ -43,15 +43,17 @@ class PDFParser:
 
                     text_content = Content(content_type=ContentType.TEXT, original=cleaned_raw_text)
                     page.add_content(text_content)
-                    LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
+                    if LOG.enabled("DEBUG"):
+                        LOG.debug(f"[raw_text]\n {cleaned_raw_text}")
 
 
 
-                # Handling tables
-                if tables:
-                    table = TableContent(tables)
+                # Handling tables, one TableContent per extracted table
+                for table_data in tables:
+                    table = TableContent(table_data)
                     page.add_content(table)
-                    LOG.debug(f"[table]\n{table}")
+                    if LOG.enabled("DEBUG"):
+                        LOG.debug(f"[table]\n{table}")
 
                 book.add_page(page)
 
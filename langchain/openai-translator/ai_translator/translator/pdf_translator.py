@@ -1,14 +1,27 @@
-from typing import Optional
-from translator.pdf_parser import PDFParser
-from translator.writer import Writer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+from book import Book, Content, ContentType, TranslationLayer
 from translator.translation_chain import TranslationChain
-from utils import LOG
+from translator.translation_memory import TranslationMemory
+from utils import LOG, Glossary
 
 class PDFTranslator:
-    def __init__(self, model_name: str):
-        self.translate_chain = TranslationChain(model_name)
-        self.pdf_parser = PDFParser()
-        self.writer = Writer()
+    def __init__(self, model_name: str, translation_memory: Optional[TranslationMemory] = None, glossary: Optional[Glossary] = None,
+                 backends: Optional[List[Dict[str, Any]]] = None):
+        self.translate_chain = TranslationChain(model_name, translation_memory=translation_memory, glossary=glossary, backends=backends)
+
+    @cached_property
+    def pdf_parser(self):
+        # pdfplumber 在第一次解析时才导入
+        from translator.pdf_parser import PDFParser
+        return PDFParser()
+
+    @cached_property
+    def writer(self):
+        # reportlab 和字体注册推迟到第一次写文件时
+        from translator.writer import Writer
+        return Writer()
 
     def translate_pdf(self,
                     input_file: str,
@@ -16,15 +29,71 @@ class PDFTranslator:
                     source_language: str = "English",
                     target_language: str = 'Chinese',
                     translation_style: str = 'standard',
-                    pages: Optional[int] = None):
-        
+                    pages: Optional[int] = None,
+                    table_mode: str = 'structured'):
+
         self.book = self.pdf_parser.parse_pdf(input_file, pages)
 
-        for page_idx, page in enumerate(self.book.pages):
-            for content_idx, content in enumerate(page.contents):
-                # Translate content.original
-                translation, status = self.translate_chain.run(str(content.original), source_language, target_language, translation_style)
+        for page in self.book.pages:
+            for content in page.contents:
                 # Update the content in self.book.pages directly
-                self.book.pages[page_idx].contents[content_idx].set_translation(translation, status)
-        
+                content.translation, content.status = self._translate_content(content, source_language, target_language, translation_style, table_mode)
+
         return self.writer.save_translated_book(self.book, output_file_format)
+
+    def translate_pdf_multi(self,
+                            input_file: str,
+                            target_languages: List[str],
+                            output_file_format: str = 'markdown',
+                            source_language: str = "English",
+                            translation_style: str = 'standard',
+                            pages: Optional[int] = None,
+                            table_mode: str = 'structured',
+                            max_workers: Optional[int] = None) -> Dict[str, str]:
+        """只解析一次 PDF，并发翻译成多种目标语言，每种语言写出一个文件。
+
+        各语言的译文保存在各自的 TranslationLayer 中，共享的 Book 不会被修改。
+
+        Returns:
+            Dict[str, str]: 目标语言到输出文件路径的映射
+        """
+        if not target_languages:
+            raise ValueError("target_languages must not be empty")
+
+        self.book = self.pdf_parser.parse_pdf(input_file, pages)
+        layers = {language: TranslationLayer(language) for language in target_languages}
+
+        output_files = {}
+        with ThreadPoolExecutor(max_workers=max_workers or len(layers)) as executor:
+            futures = {
+                executor.submit(self._translate_layer, self.book, layer, source_language, translation_style, table_mode): language
+                for language, layer in layers.items()
+            }
+            # 先翻译完的语言先写出
+            for future in as_completed(futures):
+                language = futures[future]
+                future.result()
+                output_files[language] = self.writer.save_translated_book(self.book, output_file_format, layer=layers[language])
+
+        return {language: output_files[language] for language in layers}
+
+    def _translate_layer(self, book: Book, layer: TranslationLayer, source_language: str, translation_style: str, table_mode: str):
+        for page in book.pages:
+            for content in page.contents:
+                translation, status = self._translate_content(content, source_language, layer.target_language, translation_style, table_mode)
+                layer.set_translation(content, translation, status)
+        LOG.info(f"{layer.target_language} 翻译完成")
+
+    def _translate_content(self, content: Content, source_language: str, target_language: str, translation_style: str, table_mode: str):
+        """翻译单个内容并返回 (translation, status)，不修改 content"""
+        if content.content_type == ContentType.TABLE and table_mode == 'structured':
+            # 结构化模式：以 JSON 发送单元格并校验返回结果
+            translation, status = self.translate_chain.run_table(content.get_original_as_json(), source_language, target_language, translation_style)
+            translation, status = content.parse_structured_translation(translation, status)
+            if status:
+                return translation, status
+            LOG.warning("Structured table translation failed, falling back to text mode")
+
+        # Translate content.original
+        translation, status = self.translate_chain.run(str(content.original), source_language, target_language, translation_style)
+        return content.parse_translation(translation, status)
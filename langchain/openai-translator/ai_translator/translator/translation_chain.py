@@ -1,21 +1,17 @@
-from langchain_openai import ChatOpenAI
-from langchain.chains import LLMChain
-
-from utils import LOG
-from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
+from utils import LOG, Glossary
 import os
 import re
-import zhipuai
-from langchain_core.callbacks.manager import CallbackManagerForLLMRun
-from langchain_core.messages import (
-    AIMessage,
-    BaseMessage,
-    ChatMessage,
-    HumanMessage,
-    SystemMessage,
+from typing import Any, Dict, List, Optional
+from translator.translation_memory import TranslationMemory
+from translator.model_router import ModelRouter
+
+# 结构化表格模式的附加指令，回复由 TableContent.set_structured_translation 校验
+TABLE_JSON_INSTRUCTION = (
+    "The input is a JSON object holding table cells, either as \"rows\" (a list of rows) or as \"cells\" (a list of unique cell texts). "
+    "Translate every string value and reply with a single JSON object using exactly the same key, "
+    "the same number of rows and cells, and the same order. Keep numbers, codes and empty strings unchanged. "
+    "Reply with JSON only, without code fences or explanations."
 )
-from typing import Any, Dict, List, Mapping, Optional, Union
-from pydantic import Field
 
 class ZhipuAIModel:
     """智谱AI模型的简单封装，直接使用ZhipuAI API而不通过LangChain。
@@ -27,7 +23,8 @@ class ZhipuAIModel:
         self.api_key = api_key
         self.temperature = temperature
         self.verbose = verbose
-        # 初始化客户端
+        # 初始化客户端，zhipuai SDK 只在使用该后端时导入
+        import zhipuai
         self.client = zhipuai.ZhipuAI(api_key=self.api_key)
     
     def generate(self, messages: List[Dict[str, str]]) -> str:
@@ -62,8 +59,61 @@ class ZhipuAIModel:
             LOG.error(f"ZhipuAI API调用失败: {str(e)}")
             raise e
 
+class OpenAIChatModel:
+    """OpenAI 兼容接口的封装，提供与 ZhipuAIModel 相同的 generate 接口，供 ModelRouter 使用"""
+    def __init__(self, model_name: str, api_key: str = None, base_url: str = None, temperature: float = 0.0, verbose: bool = False):
+        from langchain_openai import ChatOpenAI
+        self.chat = ChatOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            model_name=model_name,
+            temperature=temperature,
+            verbose=verbose
+        )
+
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        response = self.chat.invoke([(message["role"], message["content"]) for message in messages])
+        return response.content
+
+class ChatGLMModel:
+    """本地部署的 ChatGLM HTTP 服务的封装，提供与 ZhipuAIModel 相同的 generate 接口"""
+    def __init__(self, endpoint_url: str, timeout: int = 300):
+        self.endpoint_url = endpoint_url
+        self.timeout = timeout
+
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        # ChatGLM 服务只接受单个 prompt，将系统指令与用户输入拼接在一起
+        import requests
+        prompt = "\n".join(message["content"] for message in messages)
+        response = requests.post(self.endpoint_url, json={"prompt": prompt, "history": []}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["response"]
+
+def create_backend(backend_config: Dict[str, Any], verbose: bool = False):
+    """根据配置创建模型后端，type 可选 openai、zhipuai、chatglm"""
+    backend_type = backend_config.get("type", "openai")
+    if backend_type == "zhipuai":
+        return ZhipuAIModel(
+            model_name=backend_config["model_name"],
+            api_key=os.getenv(backend_config.get("api_key_env", "ZHIPUAI_API_KEY")),
+            temperature=0,
+            verbose=verbose
+        )
+    if backend_type == "chatglm":
+        return ChatGLMModel(endpoint_url=backend_config["endpoint_url"], timeout=backend_config.get("timeout", 300))
+    if backend_type == "openai":
+        return OpenAIChatModel(
+            model_name=backend_config["model_name"],
+            api_key=os.getenv(backend_config.get("api_key_env", "OPENAI_API_KEY")),
+            base_url=backend_config.get("base_url", os.getenv("OPENAI_BASE_URL")),
+            temperature=0,
+            verbose=verbose
+        )
+    raise ValueError(f"Unsupported backend type: {backend_type}")
+
 class TranslationChain:
-    def __init__(self, model_name: str = "gpt-3.5-turbo", verbose: bool = True):
+    def __init__(self, model_name: str = "gpt-3.5-turbo", verbose: bool = True, translation_memory: Optional[TranslationMemory] = None, glossary: Optional[Glossary] = None,
+                 backends: Optional[List[Dict[str, Any]]] = None, hedge: bool = True):
         
         # 风格指令字典
         self.style_instructions = {
@@ -78,9 +128,19 @@ class TranslationChain:
         }
         
         self.verbose = verbose
+        self.translation_memory = translation_memory
+        self.glossary = glossary
         
+        # 配置了多个后端时，由 ModelRouter 选择最快的健康后端并支持 hedged 请求
+        if backends:
+            LOG.info(f"Using model router with backends: {[backend['name'] for backend in backends]}")
+            self.model = ModelRouter(
+                {backend["name"]: create_backend(backend, verbose) for backend in backends},
+                hedge=hedge
+            )
+            self.model_type = "router"
         # 检查模型名称是否包含GLM，如果是则使用智谱AI的模型
-        if "glm" in model_name.lower():
+        elif "glm" in model_name.lower():
             try:
                 # 使用智谱AI GLM模型
                 LOG.info(f"Using GLM model: {model_name}")
@@ -102,6 +162,7 @@ class TranslationChain:
                 LOG.warning("Falling back to OpenAI model gpt-3.5-turbo")
                 # 如果GLM初始化失败，回退到使用OpenAI模型
                 self.model_type = "openai"
+                from langchain_openai import ChatOpenAI
                 self.chat = ChatOpenAI(
                     base_url=os.getenv("OPENAI_BASE_URL"),
                     api_key=os.getenv("OPENAI_API_KEY"),
@@ -113,6 +174,10 @@ class TranslationChain:
             # 使用OpenAI模型
             LOG.info(f"Using OpenAI model: {model_name}")
             self.model_type = "openai"
+            # langchain_openai 导入较慢，只在使用 OpenAI 模型时加载
+            from langchain.chains import LLMChain
+            from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
+            from langchain_openai import ChatOpenAI
             self.chat = ChatOpenAI(
                 base_url=os.getenv("OPENAI_BASE_URL"),
                 api_key=os.getenv("OPENAI_API_KEY"),
@@ -139,13 +204,48 @@ class TranslationChain:
 
     def run(self, text: str, source_language: str, target_language: str, translation_style: str = "standard") -> (str, bool):
         """使用翻译链进行翻译，支持不同的模型类型"""
+        if self.translation_memory is None:
+            style_instruction = self._make_style_instruction(text, translation_style)
+            return self._translate(text, source_language, target_language, style_instruction)
+
+        # 翻译记忆精确命中时直接复用，模糊命中时作为 few-shot 参考
+        exact, matches = self.translation_memory.lookup(text, source_language, target_language, translation_style)
+        if exact is not None:
+            LOG.debug("Translation memory exact hit")
+            return exact, True
+
+        style_instruction = self._make_style_instruction(text, translation_style)
+        if matches:
+            LOG.debug(f"Translation memory fuzzy hits: {[round(score, 2) for _, _, score in matches]}")
+            style_instruction = f"{style_instruction}\n{self.translation_memory.make_examples_instruction(matches)}"
+
+        result, status = self._translate(text, source_language, target_language, style_instruction)
+        if status:
+            self.translation_memory.add(text, result, source_language, target_language, translation_style)
+        return result, status
+
+    def run_table(self, table_json: str, source_language: str, target_language: str, translation_style: str = "standard") -> (str, bool):
+        """结构化表格模式：输入为 TableContent.get_original_as_json() 生成的 JSON，要求模型按原结构返回 JSON"""
+        style_instruction = self._make_style_instruction(table_json, translation_style)
+        return self._translate(table_json, source_language, target_language, f"{style_instruction} {TABLE_JSON_INSTRUCTION}")
+
+    def _make_style_instruction(self, text: str, translation_style: str) -> str:
+        # 获取指定风格的指令，如果没有找到就使用标准风格
+        style_instruction = self.style_instructions.get(translation_style, self.style_instructions["standard"])
+        if self.glossary is None:
+            return style_instruction
+
+        # 只注入当前文本中出现的术语，而不是整个术语表
+        glossary_instruction = self.glossary.make_instruction(text)
+        if glossary_instruction:
+            style_instruction = f"{style_instruction}\n{glossary_instruction}"
+        return style_instruction
+
+    def _translate(self, text: str, source_language: str, target_language: str, style_instruction: str) -> (str, bool):
         try:
-            # 获取指定风格的指令，如果没有找到就使用标准风格
-            style_instruction = self.style_instructions.get(translation_style, self.style_instructions["standard"])
-            
             # 根据模型类型选择不同的翻译方法
-            if self.model_type == "zhipuai":
-                # 使用智谱AI模型
+            if self.model_type in ("zhipuai", "router"):
+                # 使用智谱AI模型或多后端路由
                 system_message = {
                     "role": "system",
                     "content": f"""You are a translation expert, proficient in various languages. 
@@ -0,0 +1,151 @@
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils import LOG
+
+
+class TranslationMemory:
+    """翻译记忆库：按 (源语言, 目标语言, 风格) 保存 原文片段 → 译文片段。
+
+    精确命中直接复用译文，不再调用模型；相似度较高的片段作为 few-shot 示例
+    注入提示词，让模型只需在参考译文上做少量修改。模糊匹配使用字符 n-gram
+    倒排索引和 Jaccard 相似度，记忆内容持久化在 SQLite 中。
+    """
+
+    def __init__(self, db_path: str = "translation_memory.db", fuzzy_threshold: float = 0.75,
+                 max_examples: int = 2, ngram_size: int = 3):
+        self.db_path = db_path
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_examples = max_examples
+        self.ngram_size = ngram_size
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS segments (
+                source_language TEXT NOT NULL,
+                target_language TEXT NOT NULL,
+                style TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                PRIMARY KEY (source_language, target_language, style, source)
+            )"""
+        )
+        self._conn.commit()
+
+        # 每个语言对/风格一个分区，首次访问时从 SQLite 加载
+        self._segments: Dict[Tuple[str, str, str], List[Tuple[str, str]]] = {}
+        self._exact: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        self._index: Dict[Tuple[str, str, str], Dict[str, Set[int]]] = {}
+        self._ngram_counts: Dict[Tuple[str, str, str], List[int]] = {}
+
+    def lookup(self, text: str, source_language: str, target_language: str,
+               translation_style: str = "standard") -> Tuple[Optional[str], List[Tuple[str, str, float]]]:
+        """查询翻译记忆。
+
+        Returns:
+            (exact, matches): exact 为精确命中的译文，未命中时为 None；
+            matches 为按相似度降序排列的 (原文, 译文, 相似度) 列表。
+        """
+        key = (source_language, target_language, translation_style)
+        source = self._normalize(text)
+        with self._lock:
+            self._load_partition(key)
+            segments = self._segments[key]
+
+            segment_id = self._exact[key].get(source)
+            if segment_id is not None:
+                return segments[segment_id][1], []
+
+            ngrams = self._ngrams(source)
+            if not ngrams:
+                return None, []
+
+            # 通过倒排索引统计候选片段与查询共享的 n-gram 数量
+            overlaps = Counter()
+            index = self._index[key]
+            for ngram in ngrams:
+                overlaps.update(index.get(ngram, ()))
+
+            matches = []
+            ngram_counts = self._ngram_counts[key]
+            for candidate_id, overlap in overlaps.items():
+                score = overlap / (len(ngrams) + ngram_counts[candidate_id] - overlap)
+                if score >= self.fuzzy_threshold:
+                    candidate_source, candidate_target = segments[candidate_id]
+                    matches.append((candidate_source, candidate_target, score))
+
+        matches.sort(key=lambda match: match[2], reverse=True)
+        return None, matches[:self.max_examples]
+
+    def add(self, text: str, translation: str, source_language: str, target_language: str,
+            translation_style: str = "standard"):
+        """保存一次成功的翻译结果"""
+        key = (source_language, target_language, translation_style)
+        source = self._normalize(text)
+        if not source or not translation:
+            return
+
+        with self._lock:
+            self._load_partition(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                (source_language, target_language, translation_style, source, translation)
+            )
+            self._conn.commit()
+
+            segment_id = self._exact[key].get(source)
+            if segment_id is not None:
+                self._segments[key][segment_id] = (source, translation)
+            else:
+                self._insert(key, source, translation)
+
+    def make_examples_instruction(self, matches: List[Tuple[str, str, float]]) -> str:
+        """将模糊匹配结果组织为 few-shot 提示"""
+        examples = "\n".join(f"Source: {source}\nTranslation: {target}" for source, target, _ in matches)
+        return (
+            "The following similar segments were translated before. Reuse their wording and terminology, "
+            f"and only adapt the parts that differ:\n{examples}"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _load_partition(self, key):
+        if key in self._segments:
+            return
+
+        self._segments[key] = []
+        self._exact[key] = {}
+        self._index[key] = defaultdict(set)
+        self._ngram_counts[key] = []
+
+        rows = self._conn.execute(
+            "SELECT source, target FROM segments WHERE source_language = ? AND target_language = ? AND style = ?",
+            key
+        ).fetchall()
+        for source, target in rows:
+            self._insert(key, source, target)
+        LOG.debug(f"Loaded {len(rows)} translation memory segments for {key}")
+
+    def _insert(self, key, source, target):
+        segment_id = len(self._segments[key])
+        ngrams = self._ngrams(source)
+        self._segments[key].append((source, target))
+        self._exact[key][source] = segment_id
+        self._ngram_counts[key].append(len(ngrams))
+        for ngram in ngrams:
+            self._index[key][ngram].add(segment_id)
+
+    def _ngrams(self, text: str) -> Set[str]:
+        if len(text) < self.ngram_size:
+            return {text} if text else set()
+        return {text[i:i + self.ngram_size] for i in range(len(text) - self.ngram_size + 1)}
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip()
@@ -1,4 +1,6 @@
 import os
+import re
+from typing import Optional
 from reportlab.lib import colors, pagesizes, units
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
@@ -7,20 +9,21 @@ from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 )
 
-from book import Book, ContentType
+from book import Book, ContentType, TranslationLayer
 from utils import LOG
 
 class Writer:
     def __init__(self):
         pass
 
-    def save_translated_book(self, book: Book, ouput_file_format: str):
+    def save_translated_book(self, book: Book, ouput_file_format: str, layer: Optional[TranslationLayer] = None):
+        """写出译文。给定 layer 时从该译文层读取译文，文件名带上目标语言，如 test_translated_Japanese.md"""
         LOG.debug(ouput_file_format)
 
         if ouput_file_format.lower() == "pdf":
-            output_file_path = self._save_translated_book_pdf(book)
+            output_file_path = self._save_translated_book_pdf(book, layer=layer)
         elif ouput_file_format.lower() == "markdown":
-            output_file_path = self._save_translated_book_markdown(book)
+            output_file_path = self._save_translated_book_markdown(book, layer=layer)
         else:
             LOG.error(f"不支持文件类型: {ouput_file_format}")
             return ""
@@ -30,9 +33,9 @@ class Writer:
         return output_file_path
 
 
-    def _save_translated_book_pdf(self, book: Book, output_file_path: str = None):
+    def _save_translated_book_pdf(self, book: Book, output_file_path: str = None, layer: Optional[TranslationLayer] = None):
 
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.pdf')
+        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated{self._language_suffix(layer)}.pdf')
 
         LOG.info(f"开始导出: {output_file_path}")
 
@@ -51,16 +54,17 @@ class Writer:
         # Iterate over the pages and contents
         for page in book.pages:
             for content in page.contents:
-                if content.status:
+                translation, status = self._get_translation(content, layer)
+                if status:
                     if content.content_type == ContentType.TEXT:
                         # Add translated text to the PDF
-                        text = content.translation
+                        text = translation
                         para = Paragraph(text, simsun_style)
                         story.append(para)
 
                     elif content.content_type == ContentType.TABLE:
                         # Add table to the PDF
-                        table = content.translation
+                        table = translation
                         table_style = TableStyle([
                             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -84,23 +88,24 @@ class Writer:
         return output_file_path
 
 
-    def _save_translated_book_markdown(self, book: Book, output_file_path: str = None):
-        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated.md')
+    def _save_translated_book_markdown(self, book: Book, output_file_path: str = None, layer: Optional[TranslationLayer] = None):
+        output_file_path = book.pdf_file_path.replace('.pdf', f'_translated{self._language_suffix(layer)}.md')
 
         LOG.info(f"开始导出: {output_file_path}")
         with open(output_file_path, 'w', encoding='utf-8') as output_file:
             # Iterate over the pages and contents
             for page in book.pages:
                 for content in page.contents:
-                    if content.status:
+                    translation, status = self._get_translation(content, layer)
+                    if status:
                         if content.content_type == ContentType.TEXT:
                             # Add translated text to the Markdown file
-                            text = content.translation
+                            text = translation
                             output_file.write(text + '\n\n')
 
                         elif content.content_type == ContentType.TABLE:
                             # Add table to the Markdown file
-                            table = content.translation
+                            table = translation
                             header = '| ' + ' | '.join(str(column) for column in table.columns) + ' |' + '\n'
                             separator = '| ' + ' | '.join(['---'] * len(table.columns)) + ' |' + '\n'
                             # body = '\n'.join(['| ' + ' | '.join(row) + ' |' for row in table.values.tolist()]) + '\n\n'
@@ -111,4 +116,17 @@ class Writer:
                 if page != book.pages[-1]:
                     output_file.write('---\n\n')
 
-        return output_file_path
\ No newline at end of file
+        return output_file_path
+
+    @staticmethod
+    def _get_translation(content, layer: Optional[TranslationLayer]):
+        # 单语言翻译仍然把译文写在 Content 上
+        if layer is None:
+            return content.translation, content.status
+        return layer.get_translation(content)
+
+    @staticmethod
+    def _language_suffix(layer: Optional[TranslationLayer]) -> str:
+        if layer is None:
+            return ""
+        return "_" + re.sub(r"\W+", "_", layer.target_language).strip("_")
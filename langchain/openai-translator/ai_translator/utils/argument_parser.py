@@ -9,6 +9,10 @@ class ArgumentParser:
         self.parser.add_argument('--output_file_format', type=str, help='The file format of translated book. Now supporting PDF and Markdown')
         self.parser.add_argument('--source_language', type=str, help='The language of the original book to be translated.')
         self.parser.add_argument('--target_language', type=str, help='The target language for translating the original book.')
+        self.parser.add_argument('--target_languages', type=str, nargs='+', help='Translate one parse of the book into several target languages concurrently, writing one output per language.')
+        self.parser.add_argument('--table_mode', type=str, choices=['structured', 'text'], help='How tables are sent to the model: structured JSON cells or plain text.')
+        self.parser.add_argument('--translation_memory_path', type=str, help='SQLite file of the translation memory used to reuse previous translations.')
+        self.parser.add_argument('--glossary_file', type=str, help='CSV/TSV glossary of source and target terms injected into prompts when matched.')
         self.parser.add_argument('--zhipuai_api_key', type=str, help='API key for ChatGLM models from Zhipu AI.')
 
     def parse_arguments(self):
@@ -0,0 +1,98 @@
+import json
+import os
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+
+ANN_INDEX_FILE = "ann.faiss"
+ANN_CONFIG_FILE = "ann.json"
+INDEX_TYPES = ["flat", "ivf_flat", "hnsw", "ivf_pq"]
+
+# faiss 建议每个聚类中心至少有 39 个训练样本
+MIN_POINTS_PER_CENTROID = 39
+
+
+def default_nlist(num_vectors: int) -> int:
+    return max(1, min(int(4 * np.sqrt(num_vectors)), num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def build_ann_index(vectors: np.ndarray, index_type: str, nlist: Optional[int] = None, pq_m: int = 16,
+                    pq_nbits: int = 8, hnsw_m: int = 32, ef_construction: int = 200,
+                    max_train_size: int = 100000) -> Optional[faiss.Index]:
+    """用精确索引中的向量训练并构建近似最近邻索引（L2 距离，与 LangChain FAISS 默认一致）。
+
+    Returns:
+        构建好的索引；数据量不足以训练时返回 None，调用方继续使用精确检索。
+    """
+    if index_type == "flat":
+        return None
+
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    num_vectors, dim = vectors.shape
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m)
+        index.hnsw.efConstruction = ef_construction
+        index.add(vectors)
+        return index
+
+    nlist = nlist or default_nlist(num_vectors)
+    if index_type == "ivf_flat":
+        factory = f"IVF{nlist},Flat"
+        min_train = nlist
+    elif index_type == "ivf_pq":
+        if dim % pq_m != 0:
+            raise ValueError(f"Vector dimension {dim} must be divisible by pq_m={pq_m}")
+        factory = f"IVF{nlist},PQ{pq_m}x{pq_nbits}"
+        # PQ 码本的每个子空间需要至少 2^nbits 个训练样本
+        min_train = max(nlist, 2 ** pq_nbits)
+    else:
+        raise ValueError(f"Unsupported index type: {index_type}")
+
+    if num_vectors < min_train:
+        print(f"[ann] {num_vectors} vectors are too few to train {factory} (need {min_train}), using exact search")
+        return None
+
+    index = faiss.index_factory(dim, factory)
+    # 训练只需要一部分样本
+    if num_vectors > max_train_size:
+        sample = np.random.default_rng(0).choice(num_vectors, max_train_size, replace=False)
+        index.train(vectors[sample])
+    else:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """设置查询参数：IVF 类索引的 nprobe，HNSW 索引的 efSearch"""
+    if nprobe is not None and faiss.try_extract_index_ivf(index) is not None:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def all_vectors(index: faiss.Index) -> np.ndarray:
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def save_ann_index(index: Optional[faiss.Index], index_dir: str, config: Dict):
+    """保存近似索引及其配置；数据量不足未能构建索引时只记录配置"""
+    if index is not None:
+        faiss.write_index(index, os.path.join(index_dir, ANN_INDEX_FILE))
+    with open(os.path.join(index_dir, ANN_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+def load_ann_config(index_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(index_dir, ANN_CONFIG_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_ann_index(index_dir: str) -> Optional[faiss.Index]:
+    path = os.path.join(index_dir, ANN_INDEX_FILE)
+    return faiss.read_index(path) if os.path.exists(path) else None
@@ -0,0 +1,83 @@
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from ann_index import all_vectors, build_ann_index, set_search_params
+
+# 每种索引需要扫描的查询参数
+SEARCH_PARAMS = {
+    "ivf_flat": [{"nprobe": n} for n in (1, 4, 16, 64)],
+    "ivf_pq": [{"nprobe": n} for n in (1, 4, 16, 64)],
+    "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128)],
+}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="近似最近邻索引与精确检索的召回率/延迟对比")
+    parser.add_argument("--vector_store_dir", type=str, help="使用 ingest.py 生成的向量库中的向量")
+    parser.add_argument("--synthetic", type=int, default=100000, help="未指定向量库时生成的随机向量数量")
+    parser.add_argument("--dim", type=int, default=1536, help="随机向量的维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询数量")
+    parser.add_argument("--k", type=int, default=4, help="召回率按 top-k 计算")
+    parser.add_argument("--index_types", type=str, nargs="+", default=list(SEARCH_PARAMS), choices=list(SEARCH_PARAMS))
+    return parser.parse_args()
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.vector_store_dir:
+        from langchain_openai import OpenAIEmbeddings
+        from vector_store import load_vector_store
+        db = load_vector_store(args.vector_store_dir, OpenAIEmbeddings(), use_ann=False)
+        return all_vectors(db.index)
+
+    # 聚簇分布的随机向量比均匀分布更接近真实 Embedding
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(1, args.synthetic // 1000), args.dim)).astype("float32")
+    labels = rng.integers(0, len(centers), args.synthetic)
+    return centers[labels] + 0.3 * rng.standard_normal((args.synthetic, args.dim)).astype("float32")
+
+
+def search_latency(index, queries, k):
+    """逐条查询，模拟在线检索，返回结果与每条查询的耗时（毫秒）"""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(ids[0])
+    return np.array(results), np.array(latencies)
+
+
+def recall_at_k(results, ground_truth):
+    hits = sum(len(set(found) & set(expected)) for found, expected in zip(results, ground_truth))
+    return hits / ground_truth.size
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    vectors = np.ascontiguousarray(load_vectors(args), dtype="float32")
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype("float32")
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    ground_truth, exact_latency = search_latency(exact, queries, args.k)
+    print(f"{len(vectors)} vectors, dim={vectors.shape[1]}, {len(queries)} queries, k={args.k}")
+    print(f"{'index':<10}{'params':<18}{'build(s)':>10}{'recall':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    print(f"{'flat':<10}{'-':<18}{0:>10.2f}{1:>10.3f}{np.percentile(exact_latency, 50):>10.3f}{np.percentile(exact_latency, 99):>10.3f}")
+
+    for index_type in args.index_types:
+        start = time.perf_counter()
+        index = build_ann_index(vectors, index_type)
+        build_time = time.perf_counter() - start
+        if index is None:
+            continue
+        for params in SEARCH_PARAMS[index_type]:
+            set_search_params(index, **params)
+            results, latency = search_latency(index, queries, args.k)
+            label = ",".join(f"{key}={value}" for key, value in params.items())
+            print(f"{index_type:<10}{label:<18}{build_time:>10.2f}{recall_at_k(results, ground_truth):>10.3f}"
+                  f"{np.percentile(latency, 50):>10.3f}{np.percentile(latency, 99):>10.3f}")
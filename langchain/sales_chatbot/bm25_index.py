@@ -0,0 +1,69 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Set
+
+import numpy as np
+from langchain_core.documents import Document
+
+# 连续的汉字切成二元组，英文单词与数字保持完整
+TOKEN_PATTERN = re.compile(r"[\u4e00-\u9fff]+|[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if run.isascii() or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class LexicalHit(NamedTuple):
+    document: Document
+    score: float
+    # 查询中的词在文档里出现的比例，接近 1 说明文档包含了查询的原话
+    coverage: float
+
+
+class BM25Index:
+    """内存中的 BM25 倒排索引，每个词的文档 id 与权重预先算好，查询只需做向量累加"""
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self._term_sets: List[Set[str]] = []
+
+        postings = defaultdict(list)
+        lengths = np.zeros(len(documents), dtype="float32")
+        for i, doc in enumerate(documents):
+            counts = Counter(tokenize(doc.page_content))
+            for term, tf in counts.items():
+                postings[term].append((i, tf))
+            lengths[i] = sum(counts.values())
+            self._term_sets.append(set(counts))
+
+        num_docs = max(len(documents), 1)
+        avg_length = float(lengths.mean()) if len(documents) else 1.0
+        self._postings: Dict[str, tuple] = {}
+        for term, entries in postings.items():
+            ids = np.array([i for i, _ in entries])
+            tf = np.array([count for _, count in entries], dtype="float32")
+            idf = math.log(1 + (num_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = k1 * (1 - b + b * lengths[ids] / avg_length)
+            self._postings[term] = (ids, idf * tf * (k1 + 1) / (tf + norm))
+
+    def search(self, query: str, k: int = 4) -> List[LexicalHit]:
+        terms = set(tokenize(query))
+        if not terms or not self.documents:
+            return []
+
+        scores = np.zeros(len(self.documents), dtype="float32")
+        for term in terms:
+            if term in self._postings:
+                ids, weights = self._postings[term]
+                scores[ids] += weights
+
+        top = np.argsort(-scores)[:k]
+        return [LexicalHit(self.documents[i], float(scores[i]), len(terms & self._term_sets[i]) / len(terms))
+                for i in top if scores[i] > 0]
@@ -0,0 +1,67 @@
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+# 日志中每篇检索文档只保留开头的一小段，便于定位又不会刷屏
+DOCUMENT_PREVIEW_CHARS = 40
+
+
+class ChatLogger:
+    """结构化、采样、异步的对话日志。
+
+    每条日志是一行 JSON；调用方只组装记录字典并放入内存队列，JSON 序列化和写入都由后台线程完成，
+    不会阻塞事件循环。sample_rate 控制记录检索文档的请求比例，缓存命中等摘要信息总是记录。
+    """
+
+    def __init__(self, sample_rate: float = 0.1, log_file: Optional[str] = None):
+        self.sample_rate = sample_rate
+
+        handler = logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler(sys.stdout)
+        handler.setFormatter(_JSONFormatter())
+        log_queue = queue.SimpleQueue()
+        self._listener = QueueListener(log_queue, handler)
+        self._listener.start()
+        atexit.register(self._listener.stop)
+
+        self._logger = logging.getLogger(f"sales_chatbot.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(_RawQueueHandler(log_queue))
+
+    def log(self, event: str, documents: Optional[List[Document]] = None, **fields):
+        record = {"event": event, **fields}
+        if documents is not None:
+            record["num_documents"] = len(documents)
+            if random.random() < self.sample_rate:
+                record["documents"] = [self._describe(doc) for doc in documents]
+        self._logger.info(record)
+
+    @staticmethod
+    def _describe(doc: Document) -> dict:
+        return {
+            "id": hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()[:12],
+            "preview": doc.page_content[:DOCUMENT_PREVIEW_CHARS],
+        }
+
+
+class _RawQueueHandler(QueueHandler):
+    """原样放入队列，不在调用方线程上格式化（默认的 QueueHandler.prepare 会先格式化消息）。
+    队列只在本进程内使用，记录无需可序列化。"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _JSONFormatter(logging.Formatter):
+    """在后台线程中把记录字典序列化为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, default=str)
@@ -0,0 +1,52 @@
+from typing import List
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from bm25_index import BM25Index, tokenize
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int = 4, rrf_k: int = 60) -> List[Document]:
+    """按 1 / (rrf_k + 排名) 累加各路检索结果的得分，不需要对不同检索器的分数做归一化"""
+    scores, documents = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            documents.setdefault(key, doc)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)[:k]]
+
+
+def documents_from_faiss(db: FAISS) -> List[Document]:
+    """取出向量库中的全部文档，使 BM25 索引与当前发布的向量库版本保持一致"""
+    return [db.docstore.search(doc_id) for doc_id in db.index_to_docstore_id.values()]
+
+
+class HybridRetriever(BaseRetriever):
+    """BM25 与向量检索的混合检索。
+
+    查询几乎原样出现在某条问答中时，直接返回关键词检索结果，省去向量检索；
+    否则两路结果按倒数排名融合。向量检索因阈值过高返回空时，关键词命中仍能提供上下文，
+    避免退化为不带资料的大模型闲聊。
+    """
+
+    vector_retriever: BaseRetriever
+    bm25: BM25Index
+    k: int = 4
+    rrf_k: int = 60
+    # 关键词结果至少覆盖查询中这一比例的词才参与融合
+    min_coverage: float = 0.5
+    # 覆盖率达到该值且查询足够长时跳过向量检索
+    exact_coverage: float = 0.9
+    min_exact_terms: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        lexical = [hit for hit in self.bm25.search(query, self.k) if hit.coverage >= self.min_coverage]
+        if (lexical and lexical[0].coverage >= self.exact_coverage
+                and len(set(tokenize(query))) >= self.min_exact_terms):
+            return [hit.document for hit in lexical]
+
+        dense = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion([[hit.document for hit in lexical], dense], self.k, self.rrf_k)
@@ -0,0 +1,32 @@
+import argparse
+
+from ann_index import INDEX_TYPES
+from vector_store import create_embeddings, update_vector_store
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="增量构建房产销售问答的 FAISS 向量库")
+    parser.add_argument("--data_file", type=str, default="real_estate_sales_data.txt", help="问答数据文件")
+    parser.add_argument("--vector_store_dir", type=str, default="real_estates_sale", help="向量库目录")
+    parser.add_argument("--cache_dir", type=str, default="embedding_cache", help="Embedding 缓存目录")
+    parser.add_argument("--batch_size", type=int, default=64, help="每次 Embedding 请求包含的文本数量")
+    parser.add_argument("--index_type", type=str, default=None, choices=INDEX_TYPES,
+                        help="检索使用的索引类型，不指定时沿用已发布版本的索引配置")
+    parser.add_argument("--nlist", type=int, help="IVF 聚类中心数量，默认 4*sqrt(N)")
+    parser.add_argument("--pq_m", type=int, default=16, help="IVF-PQ 的子向量数量")
+    parser.add_argument("--hnsw_m", type=int, default=32, help="HNSW 每个节点的邻居数量")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    embeddings = create_embeddings(args.cache_dir, args.batch_size)
+    # 只有显式指定 --index_type 时才更换索引，否则沿用 ann.json 中已发布的配置
+    ann_config = None
+    if args.index_type is not None:
+        ann_config = {"index_type": args.index_type, "nlist": args.nlist, "pq_m": args.pq_m, "hnsw_m": args.hnsw_m}
+    added, removed, version = update_vector_store(args.data_file, args.vector_store_dir, embeddings, ann_config)
+    if version is None:
+        print("[ingest] 向量库已是最新，无需更新")
+    else:
+        print(f"[ingest] 新增 {added} 条，删除 {removed} 条，已发布版本 {version}")
@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class CachedBatchEmbeddings(Embeddings):
+    """查询向量化的缓存与合并：
+
+    - 最近用过的问题向量保存在进程内的 LRU 缓存中，同一问题不会重复请求 Embedding 接口；
+    - 并发到达的查询在 max_wait 秒内合并成一次批量请求，减少单次调用的网络开销。
+
+    embed_documents 直接交给底层 Embedding，供构建索引时使用。
+    """
+
+    def __init__(self, underlying: Embeddings, cache_size: int = 4096, max_batch: int = 32, max_wait: float = 0.005):
+        self.underlying = underlying
+        self.cache_size = cache_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        # 已提交但尚未返回的查询，相同问题共用一个 Future
+        self._pending: Dict[str, Future] = {}
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = None
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return self._cache[text]
+
+            self.misses += 1
+            future = self._pending.get(text)
+            if future is None:
+                future = Future()
+                self._pending[text] = future
+                self._queue.put((text, future))
+                self._ensure_worker()
+        return future.result()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "batches": self.batches,
+            }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._embed_batch(batch)
+
+    def _embed_batch(self, batch: List[Tuple[str, Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            vectors = self.underlying.embed_documents(texts)
+        except Exception as e:
+            with self._lock:
+                for text, future in batch:
+                    self._pending.pop(text, None)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches += 1
+            for text, vector in zip(texts, vectors):
+                self._pending.pop(text, None)
+                self._cache[text] = vector
+                self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
@@ -1,55 +1,130 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple
+
 import gradio as gr
 
 from langchain_openai import OpenAIEmbeddings
-from langchain.chains import RetrievalQA
+from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+from langchain_core.retrievers import BaseRetriever
 from langchain_openai import ChatOpenAI
-from langchain_community.vectorstores import FAISS
-
-
-def initialize_sales_bot(vector_store_dir: str="real_estates_sale"):
-    db = FAISS.load_local(vector_store_dir, OpenAIEmbeddings())
-    llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0)
-    
-    global SALES_BOT    
-    SALES_BOT = RetrievalQA.from_chain_type(llm,
-                                           retriever=db.as_retriever(search_type="similarity_score_threshold",
-                                                                     search_kwargs={"score_threshold": 0.8}))
-    # 返回向量数据库的检索结果
-    SALES_BOT.return_source_documents = True
-
-    return SALES_BOT
-
-def sales_chat(message, history):
-    print(f"[message]{message}")
-    print(f"[history]{history}")
-    # TODO: 从命令行参数中获取
-    enable_chat = True
-
-    ans = SALES_BOT({"query": message})
-    # 如果检索出结果，或者开了大模型聊天模式
-    # 返回 RetrievalQA combine_documents_chain 整合的结果
-    if ans["source_documents"] or enable_chat:
-        print(f"[result]{ans['result']}")
-        print(f"[source_documents]{ans['source_documents']}")
-        return ans["result"]
-    # 否则输出套路话术
-    else:
-        return "这个问题我要问问领导"
-    
-
-def launch_gradio():
+
+from bm25_index import BM25Index
+from chat_logging import ChatLogger
+from hybrid_retriever import HybridRetriever, documents_from_faiss
+from query_embeddings import CachedBatchEmbeddings
+from semantic_cache import SemanticCache
+from vector_store import current_version, load_vector_store
+
+# 检查向量库是否发布了新版本的间隔（秒）
+RELOAD_CHECK_INTERVAL = 5
+
+
+class BotState(NamedTuple):
+    """同一版本索引对应的检索器与语义缓存，热切换时整体替换"""
+    retriever: BaseRetriever
+    cache: SemanticCache
+    version: str
+
+
+class SalesBot:
+    """房产销售机器人：检索在线程池中执行，答案按 token 流式返回，多个用户的请求互不阻塞"""
+
+    def __init__(self, vector_store_dir: str="real_estates_sale", nprobe: int=16, ef_search: int=64,
+                 enable_chat: bool=True, log_sample_rate: float=0.1):
+        self.vector_store_dir = vector_store_dir
+        # nprobe / ef_search 仅在 ingest.py 构建了 IVF / HNSW 近似索引时生效
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        # 没有检索到结果时是否仍由大模型回答
+        self.enable_chat = enable_chat
+
+        # 查询向量带 LRU 缓存，并发请求合并为批量调用
+        self.embeddings = CachedBatchEmbeddings(OpenAIEmbeddings())
+        self.llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0, streaming=True)
+        # 与 RetrievalQA 默认的 stuff 提示词保持一致
+        self.prompt = PROMPT_SELECTOR.get_prompt(self.llm)
+        self.logger = ChatLogger(sample_rate=log_sample_rate)
+
+        self._reload_lock = threading.Lock()
+        self._state = self._load()
+        self._checked_at = time.monotonic()
+
+    def _load(self) -> BotState:
+        version = current_version(self.vector_store_dir)
+        db = load_vector_store(self.vector_store_dir, self.embeddings, nprobe=self.nprobe, ef_search=self.ef_search)
+        vector_retriever = db.as_retriever(search_type="similarity_score_threshold",
+                                           search_kwargs={"score_threshold": 0.8})
+        # 关键词索引由同一版本向量库中的文档构建，与向量检索融合排序
+        retriever = HybridRetriever(vector_retriever=vector_retriever, bm25=BM25Index(documents_from_faiss(db)))
+        # 语义相近的问题直接复用已有答案；索引更新后旧答案可能过时，因此随索引一起重建
+        return BotState(retriever, SemanticCache(self.embeddings), version)
+
+    def current_state(self) -> BotState:
+        """ingest.py 发布新版本索引后，无需重启即可切换到新索引；进行中的请求继续使用旧版本"""
+        with self._reload_lock:
+            if time.monotonic() - self._checked_at >= RELOAD_CHECK_INTERVAL:
+                self._checked_at = time.monotonic()
+                version = current_version(self.vector_store_dir)
+                if version != self._state.version:
+                    self.logger.log("reload", old_version=self._state.version, new_version=version)
+                    self._state = self._load()
+            return self._state
+
+    def _retrieve(self, message: str):
+        state = self.current_state()
+        cached, embedding = state.cache.lookup(message)
+        if cached is not None:
+            return state, cached, embedding, []
+        return state, None, embedding, state.retriever.invoke(message)
+
+    async def chat(self, message, history):
+        start = time.perf_counter()
+        # 向量化与 FAISS 检索都是阻塞调用，放到线程池中执行
+        state, cached, embedding, docs = await asyncio.to_thread(self._retrieve, message)
+        if cached is not None:
+            self.logger.log("cache_hit", query=message, version=state.version, cache=state.cache.stats())
+            yield cached
+            return
+
+        # 没有检索到结果且未开启大模型聊天模式时，输出套路话术
+        if not docs and not self.enable_chat:
+            self.logger.log("fallback", query=message, version=state.version, documents=docs)
+            yield "这个问题我要问问领导"
+            return
+
+        messages = self.prompt.format_messages(context="\n\n".join(doc.page_content for doc in docs),
+                                               question=message)
+        answer, first_token_at = "", None
+        async for chunk in self.llm.astream(messages):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            answer += chunk.content
+            yield answer
+
+        state.cache.add(message, answer, embedding)
+        end = time.perf_counter()
+        self.logger.log("answer", query=message, version=state.version, documents=docs,
+                        ttft_ms=round(((first_token_at or end) - start) * 1000, 1),
+                        latency_ms=round((end - start) * 1000, 1))
+
+
+def launch_gradio(bot: SalesBot):
     demo = gr.ChatInterface(
-        fn=sales_chat,
+        fn=bot.chat,
         title="房产销售",
         # retry_btn=None,
         # undo_btn=None,
         chatbot=gr.Chatbot(height=600),
+        # 处理函数是异步的，多个用户的请求可以并发执行
+        concurrency_limit=None,
     )
 
     demo.launch(share=True, server_name="0.0.0.0")
 
 if __name__ == "__main__":
     # 初始化房产销售机器人
-    initialize_sales_bot()
+    sales_bot = SalesBot()
     # 启动 Gradio 服务
-    launch_gradio()
+    launch_gradio(sales_bot)
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """语义答案缓存：对问题做 Embedding，在已回答问题的向量中查找最相似的一条，
+    余弦相似度超过阈值时直接返回缓存的答案，不再检索和调用大模型。
+
+    缓存容量固定，条目超过 ttl 秒后失效，容量满时淘汰最久未使用的条目（LRU）。
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.95, ttl: float = 3600, max_entries: int = 1000):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # 预分配的向量矩阵，每个槽位对应一条缓存，按 LRU 顺序记录在 _entries 中
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        # 每个槽位的写入时间，用于批量找出过期条目
+        self._created_at = np.zeros(max_entries, dtype="float64")
+        self._entries: "OrderedDict[int, Tuple[str, str, float]]" = OrderedDict()
+        self._free_slots: List[int] = list(range(max_entries - 1, -1, -1))
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, query: str) -> Tuple[Optional[str], np.ndarray]:
+        """查找语义相近的已回答问题。
+
+        Returns:
+            (answer, embedding): 未命中时 answer 为 None；embedding 可传给 add() 避免重复计算
+        """
+        embedding = self._normalize(self.embeddings.embed_query(query))
+        with self._lock:
+            slot = self._best_match(embedding)
+            if slot is None:
+                self.misses += 1
+                return None, embedding
+
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return self._entries[slot][1], embedding
+
+    def add(self, query: str, answer: str, embedding: Optional[np.ndarray] = None):
+        if embedding is None:
+            embedding = self._normalize(self.embeddings.embed_query(query))
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, embedding.shape[0]), dtype="float32")
+            if not self._free_slots:
+                self._evict_expired(time.monotonic())
+            if not self._free_slots:
+                # 容量已满，淘汰最久未使用的条目
+                oldest, _ = self._entries.popitem(last=False)
+                self._release(oldest)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = embedding
+            now = time.monotonic()
+            self._valid[slot] = True
+            self._created_at[slot] = now
+            self._entries[slot] = (query, answer, now)
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._entries):
+                self._release(slot)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _best_match(self, embedding: np.ndarray) -> Optional[int]:
+        if self._vectors is None or not self._entries:
+            return None
+
+        # 先淘汰所有过期条目，是否命中不取决于最相似的那条恰好是否过期
+        self._evict_expired(time.monotonic())
+        if not self._entries:
+            return None
+
+        # 向量均已归一化，内积即余弦相似度
+        scores = self._vectors @ embedding
+        scores[~self._valid] = -np.inf
+        slot = int(np.argmax(scores))
+        if scores[slot] < self.threshold:
+            return None
+        return slot
+
+    def _evict_expired(self, now: float):
+        for slot in np.flatnonzero(self._valid & (self._created_at < now - self.ttl)):
+            del self._entries[int(slot)]
+            self._release(int(slot))
+            self.evictions += 1
+
+    def _release(self, slot: int):
+        self._valid[slot] = False
+        self._free_slots.append(slot)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
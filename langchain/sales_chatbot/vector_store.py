@@ -0,0 +1,139 @@
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_community.vectorstores import FAISS
+from langchain_openai import OpenAIEmbeddings
+
+from ann_index import all_vectors, build_ann_index, load_ann_config, load_ann_index, save_ann_index, set_search_params
+
+# 向量库目录下记录当前生效版本的文件，通过原子替换该文件实现热切换
+CURRENT_FILE = "CURRENT"
+# 问答记录之间以 "1." 这样的编号行分隔
+RECORD_SEPARATOR = re.compile(r"^\s*\d+\.\s*$", re.MULTILINE)
+
+
+def load_records(data_file: str) -> List[str]:
+    """读取问答数据文件，返回每条 [客户问题]/[销售回答] 记录"""
+    with open(data_file, encoding="utf-8") as f:
+        text = f.read()
+    return [record.strip() for record in RECORD_SEPARATOR.split(text) if record.strip()]
+
+
+def record_id(text: str) -> str:
+    """以内容哈希作为文档 id，内容不变的记录无需重新向量化"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def create_embeddings(cache_dir: str = "embedding_cache", batch_size: int = 64):
+    """批量调用 OpenAI Embedding，并按文本哈希把向量缓存到本地磁盘"""
+    underlying = OpenAIEmbeddings(chunk_size=batch_size)
+    store = LocalFileStore(cache_dir)
+    return CacheBackedEmbeddings.from_bytes_store(underlying, store, namespace=underlying.model)
+
+
+def current_version(vector_store_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(vector_store_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def index_path(vector_store_dir: str) -> str:
+    """当前版本的索引目录；兼容直接由 save_local 生成的旧目录结构"""
+    version = current_version(vector_store_dir)
+    return os.path.join(vector_store_dir, version) if version else vector_store_dir
+
+
+def index_exists(vector_store_dir: str) -> bool:
+    return os.path.exists(os.path.join(index_path(vector_store_dir), "index.faiss"))
+
+
+def load_vector_store(vector_store_dir: str, embeddings, use_ann: bool = True,
+                      nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> FAISS:
+    """加载向量库。版本目录中存在近似最近邻索引时，默认用它替换精确索引进行检索"""
+    # 索引由本项目自己生成，可以安全地反序列化
+    path = index_path(vector_store_dir)
+    db = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    if use_ann:
+        ann_index = load_ann_index(path)
+        if ann_index is not None:
+            set_search_params(ann_index, nprobe=nprobe, ef_search=ef_search)
+            db.index = ann_index
+    return db
+
+
+def publish_vector_store(db: FAISS, vector_store_dir: str, ann_config: Optional[Dict] = None, keep: int = 3) -> str:
+    """把索引写入新的版本目录，再原子替换 CURRENT 文件，正在运行的机器人不会读到写了一半的索引。
+
+    精确索引（index.faiss）始终保留，作为增量更新的基础；ann_config 指定了近似索引类型时，
+    额外由全部向量训练出 ann.faiss 供检索使用。
+    """
+    os.makedirs(vector_store_dir, exist_ok=True)
+    # 版本号按时间排序，便于清理旧版本
+    version = f"v{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    version_dir = os.path.join(vector_store_dir, version)
+    db.save_local(version_dir)
+
+    if ann_config and ann_config.get("index_type", "flat") != "flat":
+        params = {key: value for key, value in ann_config.items() if key != "index_type"}
+        ann_index = build_ann_index(all_vectors(db.index), ann_config["index_type"], **params)
+        save_ann_index(ann_index, version_dir, ann_config)
+
+    tmp_file = os.path.join(vector_store_dir, f"{CURRENT_FILE}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, os.path.join(vector_store_dir, CURRENT_FILE))
+
+    # 只保留最近的几个版本
+    versions = sorted(name for name in os.listdir(vector_store_dir) if name.startswith("v"))
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(vector_store_dir, name), ignore_errors=True)
+
+    return version
+
+
+def update_vector_store(data_file: str, vector_store_dir: str, embeddings,
+                        ann_config: Optional[Dict] = None) -> Tuple[int, int, Optional[str]]:
+    """增量更新向量库：只向量化新增或修改的记录，并删除已不存在的记录。
+
+    ann_config 为 None 时沿用已发布版本的近似索引配置，传入 {"index_type": "flat"} 才会去掉近似索引。
+
+    Returns:
+        (新增记录数, 删除记录数, 新发布的版本号；没有变化时为 None)
+    """
+    records = {record_id(record): record for record in load_records(data_file)}
+
+    exists = index_exists(vector_store_dir)
+    db = load_vector_store(vector_store_dir, embeddings, use_ann=False) if exists else None
+    existing_ids = set(db.index_to_docstore_id.values()) if db is not None else set()
+
+    new_ids = [doc_id for doc_id in records if doc_id not in existing_ids]
+    stale_ids = [doc_id for doc_id in existing_ids if doc_id not in records]
+    published_ann_config = load_ann_config(index_path(vector_store_dir)) if exists else None
+    if ann_config is None:
+        ann_config = published_ann_config
+    ann_changed = (ann_config or {"index_type": "flat"}) != (published_ann_config or {"index_type": "flat"})
+    if not new_ids and not stale_ids and not ann_changed:
+        return 0, 0, None
+
+    if stale_ids:
+        db.delete(stale_ids)
+    if new_ids:
+        texts = [records[doc_id] for doc_id in new_ids]
+        if db is None:
+            db = FAISS.from_texts(texts, embeddings, ids=new_ids)
+        else:
+            db.add_texts(texts, ids=new_ids)
+
+    version = publish_vector_store(db, vector_store_dir, ann_config)
+    return len(new_ids), len(stale_ids), version
@@ -71,7 +71,8 @@ class TableContent(Content):
             if not isinstance(translation, str):
                 raise ValueError(f"Invalid translation type. Expected str, but got {type(translation)}")
 
-            LOG.debug(translation)
+            if LOG.enabled("DEBUG"):
+                LOG.debug(translation)
             # Convert the string to a list of lists
             # table_data = [row.strip().split() for row in translation.strip().split('\n')]
             # table_data = "\n".join(translation.strip().split("\n"))
@@ -79,7 +80,8 @@ class TableContent(Content):
             # Create a DataFrame from the table_data
             # translated_df = pd.DataFrame(table_data[1:], columns=table_data[0])
             translated_df = pd.df = pd.read_csv(io.StringIO(translation), header=None, names=['text', 'col', 'row'])
-            LOG.debug(translated_df)
+            if LOG.enabled("DEBUG"):
+                LOG.debug(translated_df)
             self.translation = translated_df
             self.status = status
         except Exception as e:
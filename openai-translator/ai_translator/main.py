@@ -3,26 +3,62 @@ import os
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils import ArgumentParser, ConfigLoader, LOG
-from model import GLMModel, OpenAIModel
-from translator import PDFTranslator
+from utils import ArgumentParser, LOG
+
+def create_backend(model_type, model_config, token_counter):
+    # 只导入实际用到的后端，未使用的 SDK 不会被加载
+    if model_type == 'GLMModel':
+        from model import GLMModel
+        return GLMModel(model_url=model_config['model_url'], timeout=model_config['timeout'],
+                        max_concurrency=model_config.get('max_concurrency', 2))
+    from model import OpenAIModel
+    return OpenAIModel(model=model_config['model'], api_key=model_config['api_key'], base_url=model_config['base_url'], token_counter=token_counter)
 
 if __name__ == "__main__":
     argument_parser = ArgumentParser()
     args = argument_parser.parse_arguments()
+
+    # 解析完命令行再导入翻译流程依赖的模块，--help 和参数错误可以立即返回
+    from utils import ConfigLoader, Glossary, TokenCounter
+    from translator import PDFTranslator
+
     config_loader = ConfigLoader(args.config)
 
     config = config_loader.load_config()
+    LOG.configure(**config.get('logging', {}))
 
-    model_name = args.openai_model if args.openai_model else config['OpenAIModel']['model']
-    api_key = args.openai_api_key if args.openai_api_key else config['OpenAIModel']['api_key']
-    base_url = args.openai_base_url if args.openai_base_url else config['OpenAIModel']['base_url']
-    model = OpenAIModel(model=model_name, api_key=api_key, base_url=base_url)
+    # 统计本次运行所有 OpenAI 请求的 token 用量与费用
+    token_counter = TokenCounter()
+
+    if args.model_type == 'ModelRouter':
+        # 每个后端对应配置文件中的一个小节，小节中的 type 字段指定后端类型
+        router_config = config['ModelRouter']
+        backends = {
+            name: create_backend(config[name].get('type', name), config[name], token_counter)
+            for name in router_config['backends']
+        }
+        from model import ModelRouter
+        model = ModelRouter(backends, hedge=router_config.get('hedge', True))
+    elif args.model_type == 'GLMModel':
+        model_url = args.glm_model_url if args.glm_model_url else config['GLMModel']['model_url']
+        timeout = args.timeout if args.timeout else config['GLMModel']['timeout']
+        model = create_backend('GLMModel', dict(config['GLMModel'], model_url=model_url, timeout=timeout), token_counter)
+    else:
+        model_name = args.openai_model if args.openai_model else config['OpenAIModel']['model']
+        api_key = args.openai_api_key if args.openai_api_key else config['OpenAIModel']['api_key']
+        base_url = args.openai_base_url if args.openai_base_url else config['OpenAIModel']['base_url']
+        model = create_backend('OpenAIModel', dict(model=model_name, api_key=api_key, base_url=base_url), token_counter)
 
 
     pdf_file_path = args.book if args.book else config['common']['book']
     file_format = args.file_format if args.file_format else config['common']['file_format']
 
+    glossary_path = args.glossary if args.glossary else config['common'].get('glossary')
+    glossary = Glossary.from_file(glossary_path) if glossary_path else None
+
     # 实例化 PDFTranslator 类，并调用 translate_pdf() 方法
-    translator = PDFTranslator(model)
+    translator = PDFTranslator(model, glossary=glossary)
     translator.translate_pdf(pdf_file_path, file_format)
+    LOG.info(token_counter.summary())
+    if args.model_type == 'GLMModel':
+        LOG.info(f"ChatGLM 请求调度：{model.dispatcher.stats()}")
@@ -1,3 +1,18 @@
+import importlib
+
 from .model import Model
-from .glm_model import GLMModel
-from .openai_model import OpenAIModel
\ No newline at end of file
+
+# 各后端依赖的 SDK（openai、requests 等）只在实际使用该后端时导入
+_LAZY_ATTRS = {
+    "GLMModel": ".glm_model",
+    "OpenAIModel": ".openai_model",
+    "ModelRouter": ".router",
+}
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,22 +2,18 @@ import requests
 import simplejson
 
 from model import Model
+from utils import GLMDispatcher
 
 class GLMModel(Model):
-    def __init__(self, model_url: str, timeout: int):
+    def __init__(self, model_url: str, timeout: int, max_concurrency: int = 2):
         self.model_url = model_url
         self.timeout = timeout
+        # 限制同时发往 ChatGLM 服务的请求数，相同的提示词只请求一次
+        self.dispatcher = GLMDispatcher(max_concurrency=max_concurrency)
 
     def make_request(self, prompt):
         try:
-            payload = {
-                "prompt": prompt,
-                "history": []
-            }
-            response = requests.post(self.model_url, json=payload, timeout=self.timeout)
-            response.raise_for_status()
-            response_dict = response.json()
-            translation = response_dict["response"]
+            translation = self.dispatcher.call(lambda: self._post(prompt), key=prompt)
             return translation, True
         except requests.exceptions.RequestException as e:
             raise Exception(f"请求异常：{e}")
@@ -28,3 +24,13 @@ class GLMModel(Model):
         except Exception as e:
             raise Exception(f"发生了未知错误：{e}")
         return "", False
+
+    def _post(self, prompt):
+        payload = {
+            "prompt": prompt,
+            "history": []
+        }
+        response = requests.post(self.model_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        response_dict = response.json()
+        return response_dict["response"]
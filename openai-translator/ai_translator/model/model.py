@@ -1,4 +1,6 @@
+from typing import List, Optional, Tuple
 from book import ContentType
+from utils import Glossary
 
 class Model:
     def make_text_prompt(self, text: str, target_language: str) -> str:
@@ -8,11 +10,29 @@ class Model:
         # return f"翻译为{target_language}，保持间距（空格，分隔符），以表格形式返回：\n{table}"
         return f"翻译为{target_language}，仅仅对文字部分进行翻译，其他格式务必严格保持, 不需要返回其他信息：\n{table}"
 
-    def translate_prompt(self, content, target_language: str) -> str:
+    def make_glossary_prompt(self, terms: List[Tuple[str, str]]) -> str:
+        pairs = "\n".join(f"{source} -> {target}" for source, target in terms)
+        return f"请严格使用以下术语译法：\n{pairs}\n"
+
+    def translate_prompt(self, content, target_language: str, glossary: Optional[Glossary] = None) -> str:
         if content.content_type == ContentType.TEXT:
-            return self.make_text_prompt(content.original, target_language)
+            source = content.original
+            prompt = self.make_text_prompt(source, target_language)
         elif content.content_type == ContentType.TABLE:
-            return self.make_table_prompt(content.get_original_as_str(), target_language)
+            source = content.get_original_as_str()
+            prompt = self.make_table_prompt(source, target_language)
+        else:
+            return None
+
+        # 只注入当前内容中出现的术语
+        terms = glossary.match(source) if glossary is not None else []
+        if terms:
+            prompt = self.make_glossary_prompt(terms) + prompt
+        return prompt
+
+    def fits_prompt(self, prompt) -> bool:
+        """提示词是否能放进模型上下文，默认不做检查"""
+        return True
 
     def make_request(self, prompt):
         raise NotImplementedError("子类必须实现 make_request 方法")
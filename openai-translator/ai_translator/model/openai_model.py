@@ -4,36 +4,65 @@ import time
 import os
 import openai
 
+from typing import Optional
 from model import Model
-from utils import LOG
+from utils import LOG, TokenCounter
 from openai import OpenAI
 
 class OpenAIModel(Model):
-    def __init__(self, model: str, api_key: str, base_url: str):
+    def __init__(self, model: str, api_key: str, base_url: str, token_counter: Optional[TokenCounter] = None):
         self.model = model
         self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.token_counter = token_counter or TokenCounter()
+
+    def fits_prompt(self, prompt) -> bool:
+        return self.token_counter.fits(self._count_prompt_tokens(prompt), self.model)
+
+    def _is_chat_model(self) -> bool:
+        return self.model == "gpt-3.5-turbo"
+
+    def _count_prompt_tokens(self, prompt) -> int:
+        if self._is_chat_model():
+            return self.token_counter.count_messages([{"role": "user", "content": prompt}], self.model)
+        return self.token_counter.count(prompt, self.model)
 
     def make_request(self, prompt):
+        # 发送前统计提示词 token，超出上下文的请求直接拒绝，避免无效的往返
+        prompt_tokens = self._count_prompt_tokens(prompt)
+        if not self.token_counter.fits(prompt_tokens, self.model):
+            raise Exception(f"提示词过长：{prompt_tokens} tokens 超出 {self.model} 的上下文长度")
+        # 按原文长度设置 max_tokens，避免长段落被截断
+        max_tokens = self.token_counter.completion_budget(prompt_tokens, self.model)
+
         attempts = 0
         while attempts < 3:
             try:
-                if self.model == "gpt-3.5-turbo":
+                if self._is_chat_model():
                     response = self.client.chat.completions.create(
                         model=self.model,
                         messages=[
                             {"role": "user", "content": prompt}
-                        ]
+                        ],
+                        max_tokens=max_tokens
                     )
                     translation = response.choices[0].message.content.strip()
                 else:
                     response = self.client.completions.create(
                         model=self.model,
                         prompt=prompt,
-                        max_tokens=150,
+                        max_tokens=max_tokens,
                         temperature=0
                     )
                     translation = response.choices[0].text.strip()
 
+                if response.usage is not None:
+                    self.token_counter.record(self.model, response.usage.prompt_tokens, response.usage.completion_tokens)
+                else:
+                    self.token_counter.record(self.model, prompt_tokens, self.token_counter.count(translation, self.model))
+
+                if response.choices[0].finish_reason == "length":
+                    LOG.warning(f"Translation was truncated at max_tokens={max_tokens}")
+
                 return translation, True
             except openai.RateLimitError as e:
                 attempts += 1
@@ -1,26 +1,75 @@
-from typing import Optional
+import copy
+import re
+from functools import cached_property
+from typing import List, Optional
+from book import ContentType
 from model import Model
-from translator.pdf_parser import PDFParser
-from translator.writer import Writer
-from utils import LOG
+from utils import LOG, Glossary
+
+# 优先在句子边界处切分超长文本
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？；;])\s*")
 
 class PDFTranslator:
-    def __init__(self, model: Model):
+    def __init__(self, model: Model, glossary: Optional[Glossary] = None):
         self.model = model
-        self.pdf_parser = PDFParser()
-        self.writer = Writer()
+        self.glossary = glossary
+
+    @cached_property
+    def pdf_parser(self):
+        # pdfplumber 在第一次解析时才导入
+        from translator.pdf_parser import PDFParser
+        return PDFParser()
+
+    @cached_property
+    def writer(self):
+        # reportlab 和字体注册推迟到第一次写文件时
+        from translator.writer import Writer
+        return Writer()
 
     def translate_pdf(self, pdf_file_path: str, file_format: str = 'PDF', target_language: str = '中文', output_file_path: str = None, pages: Optional[int] = None):
         self.book = self.pdf_parser.parse_pdf(pdf_file_path, pages)
 
         for page_idx, page in enumerate(self.book.pages):
             for content_idx, content in enumerate(page.contents):
-                prompt = self.model.translate_prompt(content, target_language)
-                LOG.debug(prompt)
-                translation, status = self.model.make_request(prompt)
-                LOG.info(translation)
-                
+                translation, status = self._translate_content(content, target_language)
+
                 # Update the content in self.book.pages directly
                 self.book.pages[page_idx].contents[content_idx].set_translation(translation, status)
 
         self.writer.save_translated_book(self.book, output_file_path, file_format)
+
+    def _translate_content(self, content, target_language: str):
+        prompt = self.model.translate_prompt(content, target_language, self.glossary)
+        if self.model.fits_prompt(prompt):
+            # 每段内容都会经过这里，级别关闭时跳过日志调用
+            if LOG.enabled("DEBUG"):
+                LOG.debug(prompt)
+            translation, status = self.model.make_request(prompt)
+            if LOG.enabled("INFO"):
+                LOG.info(translation)
+            return translation, status
+
+        # 超出上下文长度的文本提前拆分后分别翻译，表格无法拆分则直接跳过
+        parts = split_text(content.original) if content.content_type == ContentType.TEXT else []
+        if len(parts) < 2:
+            LOG.error(f"内容超出模型上下文长度，跳过翻译：{str(content.original)[:50]}...")
+            return "", False
+
+        LOG.debug(f"Content exceeds token budget, splitting into {len(parts)} parts")
+        results = []
+        for part in parts:
+            part_content = copy.copy(content)
+            part_content.original = part
+            results.append(self._translate_content(part_content, target_language))
+        return " ".join(translation for translation, _ in results), all(status for _, status in results)
+
+
+def split_text(text: str) -> List[str]:
+    """将文本在靠近中间的句子边界（没有时退化为空白或中点）处切成两段"""
+    middle = len(text) // 2
+    boundaries = [match.end() for match in SENTENCE_BOUNDARY.finditer(text) if 0 < match.end() < len(text)]
+    if not boundaries:
+        boundaries = [match.end() for match in re.finditer(r"\s+", text) if 0 < match.end() < len(text)]
+    split_at = min(boundaries, key=lambda pos: abs(pos - middle)) if boundaries else middle
+    parts = [text[:split_at].strip(), text[split_at:].strip()]
+    return [part for part in parts if part]
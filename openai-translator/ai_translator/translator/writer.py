@@ -100,7 +100,8 @@ class Writer:
                                         cell_text = trans_cell.text
                                         break
                             
-                            LOG.info(f"{cell_text}: {cell.position['x0']}, {page_height - cell.position['y1']}")
+                            if LOG.enabled("DEBUG"):
+                                LOG.debug(f"{cell_text}: {cell.position['x0']}, {page_height - cell.position['y1']}")
                             adjust = 10
                             c.drawString(
                                 cell.position['x0'] + adjust,
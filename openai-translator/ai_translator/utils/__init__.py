@@ -1,3 +1,20 @@
+import importlib
+
 from .argument_parser import ArgumentParser
-from .config_loader import ConfigLoader
-from .logger import LOG
\ No newline at end of file
+from .logger import LOG
+from .glossary import Glossary
+from .glm_dispatcher import GLMDispatcher
+
+# 依赖 yaml、tiktoken 的模块在首次访问时才导入，解析命令行时不加载
+_LAZY_ATTRS = {
+    "ConfigLoader": ".config_loader",
+    "TokenCounter": ".token_counter",
+}
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -4,13 +4,14 @@ class ArgumentParser:
     def __init__(self):
         self.parser = argparse.ArgumentParser(description='Translate English PDF book to Chinese.')
         self.parser.add_argument('--config', type=str, default='config.yaml', help='Configuration file with model and API settings.')
-        self.parser.add_argument('--model_type', type=str, required=True, choices=['GLMModel', 'OpenAIModel'], help='The type of translation model to use. Choose between "GLMModel" and "OpenAIModel".')        
+        self.parser.add_argument('--model_type', type=str, required=True, choices=['GLMModel', 'OpenAIModel', 'ModelRouter'], help='The type of translation model to use. Choose between "GLMModel", "OpenAIModel" and "ModelRouter".')        
         self.parser.add_argument('--glm_model_url', type=str, help='The URL of the ChatGLM model URL.')
         self.parser.add_argument('--timeout', type=int, help='Timeout for the API request in seconds.')
         self.parser.add_argument('--openai_model', type=str, help='The model name of OpenAI Model.')
         self.parser.add_argument('--openai_api_key', type=str, help='The API key for OpenAIModel.')
         self.parser.add_argument('--openai_base_url', type=str, help='The Open AI base url.')
         self.parser.add_argument('--book', type=str, help='PDF file to translate.')
+        self.parser.add_argument('--glossary', type=str, help='CSV/TSV glossary of source and target terms.')
         self.parser.add_argument('--file_format', type=str, help='The file format of translated book. Now supporting PDF and Markdown')
 
     def parse_arguments(self):
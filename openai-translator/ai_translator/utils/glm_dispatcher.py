@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class _Request(NamedTuple):
+    fn: Callable[[], Any]
+    key: Optional[Hashable]
+    future: Future
+    enqueued_at: float
+
+
+class GLMDispatcher:
+    """ChatGLM 请求的客户端调度器。
+
+    - 同时发往模型服务的请求数不超过 max_concurrency，多余的请求在客户端排队，避免 GPU 服务过载；
+    - 每个会话一个队列，空闲的工作线程按轮转顺序从各会话取请求，单个会话的大量请求不会饿死其他会话；
+    - 相同 key（例如相同的提示词）的请求在排队或执行期间只发送一次，结果共享给所有调用方；
+    - stats() 返回队列深度、执行中的请求数与排队等待时间等指标。
+    """
+
+    def __init__(self, max_concurrency: int = 2, wait_window: int = 1000):
+        self.max_concurrency = max_concurrency
+
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._futures: Dict[Hashable, Future] = {}
+        self._waits = deque(maxlen=wait_window)
+        self._queue_depth = 0
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0}
+
+        for i in range(max_concurrency):
+            threading.Thread(target=self._work, name=f"glm-dispatcher-{i}", daemon=True).start()
+
+    def submit(self, fn: Callable[[], Any], session_id: Hashable = "default", key: Optional[Hashable] = None) -> Future:
+        with self._cond:
+            self._counters["submitted"] += 1
+            if key is not None and key in self._futures:
+                self._counters["deduplicated"] += 1
+                return self._futures[key]
+
+            future = Future()
+            if key is not None:
+                self._futures[key] = future
+            self._queues.setdefault(session_id, deque()).append(_Request(fn, key, future, time.monotonic()))
+            self._queue_depth += 1
+            self._cond.notify()
+            return future
+
+    def call(self, fn: Callable[[], Any], session_id: Hashable = "default", key: Optional[Hashable] = None) -> Any:
+        return self.submit(fn, session_id, key).result()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            waits = sorted(self._waits) or [0.0]
+            return {
+                "queue_depth": self._queue_depth,
+                "in_flight": self._in_flight,
+                "sessions_waiting": len(self._queues),
+                "wait_ms_avg": sum(waits) / len(waits) * 1000,
+                "wait_ms_p95": waits[int(0.95 * (len(waits) - 1))] * 1000,
+                **self._counters,
+            }
+
+    def _next_request(self) -> _Request:
+        # 取队首会话的一个请求，该会话仍有请求时移到队尾，实现会话间轮转
+        session_id, queue = self._queues.popitem(last=False)
+        request = queue.popleft()
+        if queue:
+            self._queues[session_id] = queue
+        self._queue_depth -= 1
+        return request
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                request = self._next_request()
+                self._in_flight += 1
+                self._waits.append(time.monotonic() - request.enqueued_at)
+
+            result, error = None, None
+            try:
+                result = request.fn()
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                self._in_flight -= 1
+                self._counters["failed" if error else "completed"] += 1
+                # 请求结束后不再合并，之后相同的请求会重新发送
+                if request.key is not None:
+                    self._futures.pop(request.key, None)
+
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
@@ -0,0 +1,130 @@
+import csv
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    # 可选依赖：安装了 pyahocorasick 时使用 C 实现的自动机
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class _Automaton:
+    """纯 Python 实现的 Aho-Corasick 自动机，在未安装 pyahocorasick 时使用"""
+
+    def __init__(self, words: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for word_idx, word in enumerate(words):
+            state = 0
+            for ch in word:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(word_idx)
+
+        # 按广度优先顺序构建失败指针
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word_idx in out[state]:
+                yield end, word_idx
+
+
+class Glossary:
+    """术语表：用 Aho-Corasick 自动机扫描待翻译文本，只把命中的术语对注入提示词。
+
+    术语文件为两列的 CSV/TSV（原文术语, 译文术语），可带 source,target 表头。
+    """
+
+    def __init__(self, terms: Dict[str, str], case_sensitive: bool = False, max_terms: int = 50):
+        self.case_sensitive = case_sensitive
+        self.max_terms = max_terms
+        self._sources = [source for source in terms if source]
+        self._targets = [terms[source] for source in self._sources]
+        self._lengths = [len(source) for source in self._sources]
+
+        keys = self._sources if case_sensitive else [source.lower() for source in self._sources]
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word_idx, key in enumerate(keys):
+                self._automaton.add_word(key, word_idx)
+            if keys:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = _Automaton(keys)
+
+    @classmethod
+    def from_file(cls, file_path: str, **kwargs) -> "Glossary":
+        delimiter = "\t" if file_path.endswith(".tsv") else ","
+        terms = {}
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter=delimiter):
+                if len(row) < 2 or row[0].strip().lower() == "source":
+                    continue
+                terms[row[0].strip()] = row[1].strip()
+        return cls(terms, **kwargs)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def match(self, text: str) -> List[Tuple[str, str]]:
+        """返回文本中出现的 (原文术语, 译文术语)，按首次出现的位置排序"""
+        if not self._sources or not text:
+            return []
+
+        haystack = text if self.case_sensitive else text.lower()
+        matched = {}
+        for end, word_idx in self._automaton.iter(haystack):
+            if word_idx in matched:
+                continue
+            start = end - self._lengths[word_idx] + 1
+            if self._is_word_boundary(haystack, start, end):
+                matched[word_idx] = start
+                if len(matched) >= self.max_terms:
+                    break
+
+        ordered = sorted(matched, key=matched.get)
+        return [(self._sources[word_idx], self._targets[word_idx]) for word_idx in ordered]
+
+    def make_instruction(self, text: str) -> str:
+        """生成术语约束提示，没有命中任何术语时返回空字符串"""
+        terms = self.match(text)
+        if not terms:
+            return ""
+        pairs = "\n".join(f"{source} -> {target}" for source, target in terms)
+        return f"Use the following terminology consistently:\n{pairs}"
+
+    @staticmethod
+    def _is_word_boundary(text: str, start: int, end: int) -> bool:
+        # 仅对拉丁字母/数字检查单词边界，中日韩文本没有空格分词
+        def is_word_char(ch):
+            return ch.isascii() and ch.isalnum()
+
+        if is_word_char(text[start]) and start > 0 and is_word_char(text[start - 1]):
+            return False
+        if is_word_char(text[end]) and end + 1 < len(text) and is_word_char(text[end + 1]):
+            return False
+        return True
@@ -1,12 +1,23 @@
-from loguru import logger
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
 
 LOG_FILE = "translation.log"
-ROTATION_TIME = "02:00"
+# 日志文件达到该大小时轮转，只保留最近的若干个文件
+ROTATION = 20 * 1024 * 1024
+RETENTION = 5
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
 
 class Logger:
-    def __init__(self, name="translation", log_dir="logs", debug=False):
+    def __init__(self, name="translation", log_dir="logs", debug=False, console_level=None, file_level="DEBUG",
+                 rotation=ROTATION, retention=RETENTION, background=False, sample_rates=None):
+        from loguru import logger
+
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
         log_file_path = os.path.join(log_dir, LOG_FILE)
@@ -14,14 +25,118 @@ class Logger:
         # Remove default loguru handler
         logger.remove()
 
-        # Add console handler with a specific log level
-        level = "DEBUG" if debug else "INFO"
-        logger.add(sys.stdout, level=level)
-        # Add file handler with a specific log level and timed rotation
-        logger.add(log_file_path, rotation=ROTATION_TIME, level="DEBUG")
+        # 采样在每条记录进入 handler 前决定一次，控制台和文件看到的是同一批记录
+        record_filter = None
+        if sample_rates:
+            logger = logger.patch(_sampler({level.upper(): rate for level, rate in sample_rates.items()}))
+            record_filter = _is_sampled
+
+        level = console_level or ("DEBUG" if debug else "INFO")
+        self.listener = None
+        if background:
+            # 调用方只格式化消息并放入队列，终端和磁盘 I/O 都在后台线程中完成。
+            # 不用 loguru 的 enqueue=True：它为跨进程而 pickle 每条记录，单次调用反而更慢
+            sink, self.listener = _background_sink(level, log_file_path, file_level, rotation, retention)
+            logger.add(sink, level=min(LEVELS[level.upper()], LEVELS[file_level.upper()]), filter=record_filter)
+        else:
+            # Add console handler with a specific log level
+            logger.add(sys.stdout, level=level, filter=record_filter)
+            # Add file handler with a specific log level and size-based rotation
+            logger.add(log_file_path, level=file_level, rotation=rotation, retention=retention, filter=record_filter)
         self.logger = logger
 
-LOG = Logger(debug=True).logger
+    def stop(self):
+        """写完队列中剩余的日志并停止后台线程"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+def _background_sink(console_level, log_file_path, file_level, rotation, retention):
+    records = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    log_file = logging.handlers.RotatingFileHandler(log_file_path, maxBytes=rotation, backupCount=retention,
+                                                    encoding="utf-8")
+    for handler, level in ((console, console_level), (log_file, file_level)):
+        handler.setLevel(LEVELS[level.upper()])
+        # loguru 格式化后的消息已经以换行结尾
+        handler.terminator = ""
+    listener = logging.handlers.QueueListener(records, console, log_file, respect_handler_level=True)
+    listener.start()
+
+    def sink(message):
+        records.put(logging.makeLogRecord({"msg": str(message), "levelno": message.record["level"].no}))
+    return sink, listener
+
+def _sampler(sample_rates):
+    def patch(record):
+        rate = sample_rates.get(record["level"].name)
+        record["extra"]["sampled"] = rate is None or random.random() < rate
+    return patch
+
+def _is_sampled(record):
+    return record["extra"].get("sampled", True)
+
+class LazyLogger:
+    """在第一次写日志时才导入 loguru、创建日志目录和 handler。
+
+    只解析命令行（如 --help）或提前退出的进程不再承担这部分开销，也不会在当前目录留下 logs/。
+    热点路径可以先用 enabled() 判断级别，级别关闭时连日志参数都不必格式化。
+    """
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._logger = None
+        self._instance = None
+        self._cached = set()
+        self._lock = threading.Lock()
+        self._update_switches()
+
+    def configure(self, **kwargs):
+        """更新日志配置（通常来自配置文件的 logging 小节），已经初始化时按新配置重建 handler"""
+        with self._lock:
+            self._kwargs.update(kwargs)
+            self._update_switches()
+            if self._logger is not None:
+                for name in self._cached:
+                    delattr(self, name)
+                self._cached.clear()
+                self._instance.stop()
+                self._create()
+
+    def enabled(self, level):
+        """该级别的日志是否可能被写出：低于所有 handler 的级别，或采样率为 0 时返回 False"""
+        return LEVELS[level] >= self._min_level_no and self._sample_rates.get(level, 1) > 0
+
+    def stop(self):
+        """写完后台队列中剩余的日志并停止后台线程"""
+        if self._instance is not None:
+            self._instance.stop()
+
+    def _update_switches(self):
+        console_level = self._kwargs.get("console_level") or ("DEBUG" if self._kwargs.get("debug") else "INFO")
+        file_level = self._kwargs.get("file_level", "DEBUG")
+        self._min_level_no = min(LEVELS[console_level.upper()], LEVELS[file_level.upper()])
+        self._sample_rates = {level.upper(): rate for level, rate in (self._kwargs.get("sample_rates") or {}).items()}
+
+    def _get_logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._create()
+        return self._logger
+
+    def _create(self):
+        self._instance = Logger(**self._kwargs)
+        self._logger = self._instance.logger
+
+    def __getattr__(self, name):
+        attr = getattr(self._get_logger(), name)
+        # 缓存到实例上，之后的调用不再经过 __getattr__
+        setattr(self, name, attr)
+        self._cached.add(name)
+        return attr
+
+LOG = LazyLogger(debug=True)
+atexit.register(LOG.stop)
 
 if __name__ == "__main__":
     log = Logger().logger
@@ -0,0 +1,98 @@
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List
+
+import tiktoken
+
+# 模型上下文窗口大小（token），按最长前缀匹配模型名
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-instruct": 4096,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# 每 1K token 的价格（美元）：(输入, 输出)
+PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-3.5-turbo-instruct": (0.0015, 0.002),
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+
+# 译文长度相对提示词长度的预估倍数，以及最少预留的输出 token
+COMPLETION_RATIO = 1.5
+MIN_COMPLETION_TOKENS = 256
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """按模型缓存 tiktoken 编码器，未知模型使用 cl100k_base"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _lookup(table: Dict, model: str, default=None):
+    matches = [name for name in table if model.startswith(name)]
+    return table[max(matches, key=len)] if matches else default
+
+
+class TokenCounter:
+    """统计提示词 token 数，按原文长度估算 max_tokens，并累计每次运行的 token 用量与费用"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.usage = defaultdict(lambda: {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0})
+
+    def count(self, text: str, model: str) -> int:
+        return len(get_encoding(model).encode(text))
+
+    def count_messages(self, messages: List[Dict[str, str]], model: str) -> int:
+        # 每条消息额外约 3 个 token，回复前缀再加 3 个
+        encoding = get_encoding(model)
+        tokens = 3
+        for message in messages:
+            tokens += 3 + sum(len(encoding.encode(value)) for value in message.values())
+        return tokens
+
+    def context_window(self, model: str) -> int:
+        return _lookup(CONTEXT_WINDOWS, model, DEFAULT_CONTEXT_WINDOW)
+
+    def expected_completion_tokens(self, prompt_tokens: int) -> int:
+        return max(MIN_COMPLETION_TOKENS, int(prompt_tokens * COMPLETION_RATIO))
+
+    def fits(self, prompt_tokens: int, model: str) -> bool:
+        """提示词加上预计的译文长度是否能放进模型上下文"""
+        return prompt_tokens + self.expected_completion_tokens(prompt_tokens) <= self.context_window(model)
+
+    def completion_budget(self, prompt_tokens: int, model: str) -> int:
+        return min(self.expected_completion_tokens(prompt_tokens), self.context_window(model) - prompt_tokens)
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            usage = self.usage[model]
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+
+    def cost(self, model: str) -> float:
+        prompt_price, completion_price = _lookup(PRICES, model, (0.0, 0.0))
+        usage = self.usage[model]
+        return (usage["prompt_tokens"] * prompt_price + usage["completion_tokens"] * completion_price) / 1000
+
+    def summary(self) -> str:
+        with self._lock:
+            lines = [
+                f"{model}: {usage['requests']} requests, {usage['prompt_tokens']} prompt tokens, "
+                f"{usage['completion_tokens']} completion tokens, ${self.cost(model):.4f}"
+                for model, usage in self.usage.items()
+            ]
+        return "Token usage:\n" + "\n".join(lines) if lines else "Token usage: no requests"
@@ -0,0 +1,140 @@
+"""批量生成 Embedding，并以内存映射的 float32 矩阵保存在磁盘上。
+
+向量存为 {prefix}.npy，其余字段存为 {prefix}.meta.csv（不含向量），两者按行对应。
+加载时向量矩阵通过 mmap 按需读入，无需像 CSV 方案那样用 literal_eval 逐行解析字符串。
+
+用法：
+    python embedding_store.py build --input data/fine_food_reviews_1k.csv --output data/fine_food_reviews_1k_store
+    python embedding_store.py search --output data/fine_food_reviews_1k_store --query "delicious beans"
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from openai import APIConnectionError, APITimeoutError, InternalServerError, OpenAI, RateLimitError
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# 单次请求最多包含的文本数量
+BATCH_SIZE = 256
+# 可以重试的错误：限流、超时、连接失败和服务端错误
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def embed_batch(client: OpenAI, texts: List[str], model: str = EMBEDDING_MODEL, max_retries: int = 6) -> np.ndarray:
+    """一次请求生成一批文本的向量，遇到限流等错误时按指数退避重试"""
+    for attempt in range(max_retries):
+        try:
+            res = client.embeddings.create(input=texts, model=model)
+            # 返回结果带有 index 字段，按它排序以保证与输入顺序一致
+            data = sorted(res.data, key=lambda item: item.index)
+            return np.array([item.embedding for item in data], dtype=np.float32)
+        except RETRYABLE_ERRORS:
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(min(2 ** attempt, 30) + np.random.uniform(0, 1))
+
+
+def embed_texts(texts: List[str], client: Optional[OpenAI] = None, model: str = EMBEDDING_MODEL,
+                batch_size: int = BATCH_SIZE, max_workers: int = 4) -> np.ndarray:
+    """把文本切成多个批次并发请求，返回 (len(texts), dim) 的 float32 矩阵"""
+    client = client or OpenAI()
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda batch: embed_batch(client, batch, model), batches))
+    return np.vstack(results) if results else np.zeros((0, 0), dtype=np.float32)
+
+
+class EmbeddingStore:
+    """磁盘上的向量库：float32 向量矩阵（.npy，内存映射）+ 元数据（.meta.csv）"""
+
+    def __init__(self, vectors: np.ndarray, metadata: pd.DataFrame):
+        if len(vectors) != len(metadata):
+            raise ValueError(f"vectors ({len(vectors)}) and metadata ({len(metadata)}) have different lengths")
+        self.vectors = vectors
+        self.metadata = metadata
+        self._norms = None
+
+    @classmethod
+    def build(cls, texts: List[str], metadata: pd.DataFrame, **kwargs) -> "EmbeddingStore":
+        return cls(embed_texts(texts, **kwargs), metadata.reset_index(drop=True))
+
+    @classmethod
+    def load(cls, prefix: str) -> "EmbeddingStore":
+        vectors = np.load(f"{prefix}.npy", mmap_mode="r")
+        metadata = pd.read_csv(f"{prefix}.meta.csv")
+        return cls(vectors, metadata)
+
+    def save(self, prefix: str):
+        np.save(f"{prefix}.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+        self.metadata.to_csv(f"{prefix}.meta.csv", index=False)
+
+    @property
+    def norms(self) -> np.ndarray:
+        # 向量的模只计算一次，之后每次查询只需一次矩阵乘法
+        if self._norms is None:
+            self._norms = np.linalg.norm(self.vectors, axis=1)
+        return self._norms
+
+    def cosine_similarity(self, query: np.ndarray) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32)
+        return (self.vectors @ query) / (self.norms * np.linalg.norm(query) + 1e-12)
+
+    def top_k(self, query: np.ndarray, k: int = 3) -> pd.DataFrame:
+        """返回与查询向量余弦相似度最高的 k 行元数据，附带 similarity 列"""
+        scores = self.cosine_similarity(query)
+        k = min(k, len(scores))
+        # argpartition 只做部分排序，再对前 k 个排序
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        result = self.metadata.iloc[top].copy()
+        result["similarity"] = scores[top]
+        return result
+
+    def cluster(self, n_clusters: int = 4, random_state: int = 42) -> np.ndarray:
+        """对全部向量做 K-Means 聚类，返回每行的聚类标签"""
+        from sklearn.cluster import KMeans
+
+        kmeans = KMeans(n_clusters=n_clusters, init="k-means++", random_state=random_state, n_init=10)
+        return kmeans.fit_predict(np.asarray(self.vectors))
+
+
+def load_reviews(input_path: str, top_n: int = 1000) -> pd.DataFrame:
+    """与 embedding.ipynb 相同的预处理：合并标题与正文，取最近的 top_n 条评论"""
+    df = pd.read_csv(input_path, index_col=0)
+    df = df[["Time", "ProductId", "UserId", "Score", "Summary", "Text"]].dropna()
+    df["combined"] = "Title: " + df.Summary.str.strip() + "; Content: " + df.Text.str.strip()
+    return df.sort_values("Time").tail(top_n).drop("Time", axis=1)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="批量生成评论向量并进行相似度检索")
+    parser.add_argument("command", choices=["build", "search"])
+    parser.add_argument("--input", type=str, default="data/fine_food_reviews_1k.csv", help="评论数据 CSV")
+    parser.add_argument("--output", type=str, default="data/fine_food_reviews_1k_store", help="向量库文件前缀")
+    parser.add_argument("--query", type=str, default="delicious beans", help="检索内容")
+    parser.add_argument("--k", type=int, default=3, help="返回的结果数量")
+    parser.add_argument("--max_workers", type=int, default=4, help="并发请求数")
+    args = parser.parse_args()
+    # 向量库文件不能覆盖输入的评论数据
+    if args.command == "build" and os.path.realpath(args.input) in (
+            os.path.realpath(f"{args.output}{suffix}") for suffix in (".npy", ".meta.csv")):
+        parser.error(f"--output {args.output} would overwrite --input {args.input}")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.command == "build":
+        reviews = load_reviews(args.input)
+        store = EmbeddingStore.build(reviews.combined.tolist(), reviews, max_workers=args.max_workers)
+        store.save(args.output)
+        print(f"Saved {len(reviews)} vectors to {args.output}.npy")
+    else:
+        store = EmbeddingStore.load(args.output)
+        query = embed_texts([args.query])[0]
+        for _, row in store.top_k(query, args.k).iterrows():
+            print(f"{row.similarity:.3f} {row.combined[:200]}")
@@ -0,0 +1,183 @@
+"""供 Function Calling 使用的只读 SQLite 查询工具。
+
+与 function_call.ipynb 中每次调用都重新连接、重新读取表结构的写法相比：
+- 连接以只读模式打开并放入连接池复用，每个连接自带预编译语句缓存；
+- 表结构描述字符串只生成一次；
+- 返回行数有上限，单条查询有超时，模型生成的失控查询不会卡住进程。
+
+用法：
+    tool = SQLiteTool("data/chinook.db")
+    functions = [tool.function_definition()]
+    tool.ask_database("SELECT Name FROM artists LIMIT 3")
+"""
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 只读的表结构类 PRAGMA，其余 PRAGMA（包括 query_only 本身）一律拒绝
+_READ_ONLY_PRAGMAS = frozenset({
+    "table_info", "table_xinfo", "index_list", "index_info", "index_xinfo", "foreign_key_list",
+})
+
+# 这些错误说明连接本身可能已不可用（查询被中断、I/O 错误、文件损坏），需要换新连接；
+# 语法错误、授权拒绝等普通错误不影响连接，连接和语句缓存照常复用
+_CONNECTION_BREAKING_ERRORS = frozenset({
+    sqlite3.SQLITE_INTERRUPT, sqlite3.SQLITE_IOERR, sqlite3.SQLITE_CORRUPT, sqlite3.SQLITE_NOTADB,
+    sqlite3.SQLITE_CANTOPEN,
+})
+
+
+def _breaks_connection(error: BaseException) -> bool:
+    # sqlite_errorcode 可能是扩展错误码，低 8 位是主错误码
+    code = getattr(error, "sqlite_errorcode", None)
+    return code is not None and code & 0xFF in _CONNECTION_BREAKING_ERRORS
+
+
+def _authorize(action, arg1, arg2, db_name, trigger):
+    # ATTACH 可以打开另一个可写的数据库文件，绕过 mode=ro
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    # PRAGMA query_only = OFF 等语句可以解除只读限制
+    if action == sqlite3.SQLITE_PRAGMA and arg1.lower() not in _READ_ONLY_PRAGMAS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+class _PooledConnection:
+    """连接及其当前查询的截止时间，超过截止时间时由进度回调中断查询"""
+
+    def __init__(self, db_path: str, statement_cache_size: int, progress_interval: int):
+        # mode=ro 以只读方式打开文件，query_only 再禁止任何写语句
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False,
+                                    cached_statements=statement_cache_size)
+        self.conn.execute("PRAGMA query_only = ON")
+        # query_only 设置完之后才安装授权回调，之后任何连接上的语句都无法再修改它
+        self.conn.set_authorizer(_authorize)
+        self.conn.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 0)
+        self.deadline = float("inf")
+        self.conn.set_progress_handler(self._check_deadline, progress_interval)
+
+    def _check_deadline(self) -> int:
+        # 返回非零值时 SQLite 中断当前查询，抛出 OperationalError: interrupted
+        return 1 if time.monotonic() > self.deadline else 0
+
+
+class SQLiteTool:
+    def __init__(self, db_path: str, pool_size: int = 4, max_rows: int = 100, timeout: float = 5.0,
+                 statement_cache_size: int = 128, progress_interval: int = 10000):
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self._statement_cache_size = statement_cache_size
+        self._progress_interval = progress_interval
+
+        # None 表示一个空位：替换连接失败时先空着，下次取到时再尝试重新连接
+        self._pool: "queue.Queue[Optional[_PooledConnection]]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._new_connection())
+        self._schema_string = None
+
+    def _new_connection(self) -> _PooledConnection:
+        return _PooledConnection(self.db_path, self._statement_cache_size, self._progress_interval)
+
+    @contextmanager
+    def _connection(self):
+        pooled = self._pool.get()
+        if pooled is None:
+            try:
+                pooled = self._new_connection()
+            except BaseException:
+                self._pool.put(None)
+                raise
+        try:
+            yield pooled
+        except BaseException as e:
+            if _breaks_connection(e):
+                # 已关闭的连接绝不放回连接池；新连接建立失败时只留下空位
+                pooled.conn.close()
+                try:
+                    pooled = self._new_connection()
+                except Exception:
+                    pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                pooled.deadline = float("inf")
+            self._pool.put(pooled)
+
+    def get_database_info(self) -> List[Dict]:
+        """返回一个字典列表，每个字典包含一个表的名字和列名"""
+        with self._connection() as pooled:
+            tables = pooled.conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+            return [
+                {
+                    "table_name": table_name,
+                    "column_names": [col[1] for col in pooled.conn.execute(f"PRAGMA table_info('{table_name}');")],
+                }
+                for (table_name,) in tables
+            ]
+
+    @property
+    def schema_string(self) -> str:
+        # 数据库是只读的，表结构不会变化，只需生成一次
+        if self._schema_string is None:
+            self._schema_string = "\n".join(
+                f"Table: {table['table_name']}\nColumns: {', '.join(table['column_names'])}"
+                for table in self.get_database_info()
+            )
+        return self._schema_string
+
+    def function_definition(self) -> Dict:
+        """ask_database 函数的描述，可直接放入 functions / tools 参数"""
+        return {
+            "name": "ask_database",
+            "description": "Use this function to answer user questions about music. Output should be a fully formed SQL query.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": f"""
+                            SQL query extracting info to answer the user's question.
+                            SQL should be written using this database schema:
+                            {self.schema_string}
+                            The query should be returned in plain text, not in JSON.
+                            """,
+                    }
+                },
+                "required": ["query"],
+            },
+        }
+
+    def query(self, sql: str) -> List[tuple]:
+        """执行只读查询，最多返回 max_rows + 1 行，多出的一行用于判断结果是否被截断"""
+        with self._connection() as pooled:
+            pooled.deadline = time.monotonic() + self.timeout
+            cursor = pooled.conn.execute(sql)
+            try:
+                return cursor.fetchmany(self.max_rows + 1)
+            finally:
+                cursor.close()
+
+    def ask_database(self, sql: str) -> str:
+        """使用 sql 查询数据库，返回给模型的字符串结果；出错时返回错误信息"""
+        try:
+            rows = self.query(sql)
+        except sqlite3.OperationalError as e:
+            if str(e) == "interrupted":
+                return f"query failed with error: query exceeded the {self.timeout}s time limit"
+            return f"query failed with error: {e}"
+        except Exception as e:
+            return f"query failed with error: {e}"
+
+        if len(rows) > self.max_rows:
+            return f"{rows[:self.max_rows]}\n(only the first {self.max_rows} rows are shown)"
+        return str(rows)
+
+    def close(self):
+        while not self._pool.empty():
+            pooled = self._pool.get_nowait()
+            if pooled is not None:
+                pooled.conn.close()